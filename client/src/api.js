@@ -67,7 +67,9 @@ export const newsApi = {
 
 export const vehiclesApi = {
     getAll: (params) => api.get('/vehicles', { params }),
+    search: (params) => api.get('/vehicles/search', { params }),
     getById: (id) => api.get(`/vehicles/${id}`),
+    getFull: (id) => api.get(`/vehicles/${id}/full`),
     create: (data) => api.post('/vehicles', data),
     update: (id, data) => api.put(`/vehicles/${id}`, data),
     delete: (id) => api.delete(`/vehicles/${id}`),
@@ -75,6 +77,10 @@ export const vehiclesApi = {
     updatePublicationDate: (id) => api.put(`/vehicles/${id}/update-publication-date`),
 };
 
+export const catalogApi = {
+    getBootstrap: (params) => api.get('/catalog/bootstrap', { params })
+};
+
 export const categoriesApi = {
     getAll: () => api.get('/categories'),
     getById: (id) => api.get(`/categories/${id}`),
@@ -160,4 +166,13 @@ export const imagesApi = {
 
 };
 
+// Адрес изображения; имя файла из image_path служит версией и позволяет кэшировать ответ навсегда
+export const imageUrl = (kind, id, imagePath, size) => {
+    const params = new URLSearchParams()
+    if (size) params.set('size', size)
+    if (imagePath) params.set('v', imagePath.split('/').pop())
+    const query = params.toString()
+    return `http://localhost:8000/images/${kind}/${id}${query ? `?${query}` : ''}`
+};
+
 export default api
@@ -1,34 +1,19 @@
 import { Card, Row, Col, Button } from 'react-bootstrap'
 import { Link } from 'react-router-dom'
+import { imageUrl } from '../api'
 
-export default function CatalogVehicleList({ vehicles, filters }) {
-    const filteredVehicles = vehicles.filter(vehicle => {
-
-        if (filters.category && vehicle.category_id != filters.category)
-            return false
-        if (filters.chassis && vehicle.chassis_id != filters.chassis)
-            return false
-        if (filters.factory && vehicle.factory_id != filters.factory)
-            return false
-        if (filters.wheelFormula && vehicle.wheel_formula_id != filters.wheelFormula)
-            return false
-        if (filters.engine && vehicle.engine_id != filters.engine)
-            return false
-
-        return true
-    })
-
+export default function CatalogVehicleList({ vehicles }) {
     return (
         <>
-            {filteredVehicles.length === 0 && <p>Нет техники по выбранным фильтрам</p>}
+            {vehicles.length === 0 && <p>Нет техники по выбранным фильтрам</p>}
 
-            {filteredVehicles.map(vehicle => (
+            {vehicles.map(vehicle => (
                 <Card className="mb-3" key={vehicle.vehicle_id}>
                     <Card.Body>
                         <Row className="align-items-center">
                             <Col md={3}>
                                 <img
-                                    src={`http://localhost:8000/images/vehicles/${vehicle.vehicle_id}`}
+                                    src={imageUrl('vehicles', vehicle.vehicle_id, vehicle.image_path, 'thumb')}
                                     alt={vehicle.title}
                                     style={{
                                         width: '100%',
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { Card, Button, Row, Col } from 'react-bootstrap';
 import { Link } from 'react-router-dom';
-import { vehiclesApi } from '../api';
+import { vehiclesApi, imageUrl } from '../api';
 
 export default function HomeVehicleList() {
     const [vehicles, setVehicles] = useState([]);
@@ -23,7 +23,7 @@ export default function HomeVehicleList() {
                     <Card>
                         <Card.Img
                             variant="top"
-                            src={`http://localhost:8000/images/vehicles/${vehicle.vehicle_id}`}
+                            src={imageUrl('vehicles', vehicle.vehicle_id, vehicle.image_path, 'thumb')}
                             alt={vehicle.name}
                             style={{ height: '200px', objectFit: 'cover' }}
                         />
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import { Container, Carousel } from 'react-bootstrap';
-import { newsApi } from '../api'
+import { newsApi, imageUrl } from '../api'
 
 export default function NewsCarousel() {
     const [news, setNews] = useState([]);
@@ -27,7 +27,7 @@ export default function NewsCarousel() {
                     <Carousel.Item key={item.news_id}>
                         <img
                             className='d-block w-100'
-                            src={`http://localhost:8000/images/news/${item.news_id}`}
+                            src={imageUrl('news', item.news_id, item.image_path, 'large')}
                             alt={item.title}
                             style={{ objectFit: 'cover', height: '400px', width: '100%' }}
                         />
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { Container, Row, Col, Form } from 'react-bootstrap'
-import { categoriesApi, chassisApi, factoriesApi, wheelFormulasApi, enginesApi, vehiclesApi } from '../api'
+import { catalogApi, vehiclesApi } from '../api'
 
 import CatalogVehicleList from '../components/CatalogVehicleList';
 
@@ -25,28 +25,33 @@ export default function CatalogPage() {
 
     useEffect(() => {
         const fetchFilters = async () => {
-            const categoryResponse = await categoriesApi.getAll()
-            setCategories(categoryResponse.data);
-
-            const engineResponse = await enginesApi.getAll();
-            setEngine(engineResponse.data);
-
-            const chassisResponse = await chassisApi.getAll();
-            setChassis(chassisResponse.data);
-
-            const wheelFormulaResponse = await wheelFormulasApi.getAll();
-            setWheelFormula(wheelFormulaResponse.data);
-
-            const factoryResponse = await factoriesApi.getAll();
-            setFactories(factoryResponse.data);
-
-            const catalogResponse = await vehiclesApi.getAll();
-            setCatalog(catalogResponse.data);
+            const { data } = await catalogApi.getBootstrap()
+            setCategories(data.categories);
+            setEngine(data.engines);
+            setChassis(data.chassis);
+            setWheelFormula(data.wheel_formulas);
+            setFactories(data.factories);
         }
 
         fetchFilters()
     }, [])
 
+    useEffect(() => {
+        const fetchCatalog = async () => {
+            const params = {
+                category_id: filters.category || undefined,
+                chassis_id: filters.chassis || undefined,
+                factory_id: filters.factory || undefined,
+                wheel_formula_id: filters.wheelFormula || undefined,
+                engine_id: filters.engine || undefined
+            }
+            const catalogResponse = await vehiclesApi.search(params);
+            setCatalog(catalogResponse.data.items);
+        }
+
+        fetchCatalog()
+    }, [filters])
+
     const handleChange = (e) => {
         const { name, value } = e.target
         setFilters(prev => ({ ...prev, [name]: value }))
@@ -114,7 +119,7 @@ export default function CatalogPage() {
                 <Col md={9}>
                     <h5>Техника</h5>
                     
-                    <CatalogVehicleList vehicles={catalog} filters={filters} />
+                    <CatalogVehicleList vehicles={catalog} />
                 </Col>
             </Row>
         </Container>
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { Row, Col, Container, Card, Form, Button } from 'react-bootstrap'
 import { useNavigate } from 'react-router-dom'
-import { categoriesApi, factoriesApi, chassisApi, wheelFormulasApi, enginesApi, vehiclesApi, imagesApi, priceListsApi } from '../api'
+import { catalogApi, vehiclesApi, imagesApi, priceListsApi } from '../api'
 import { useAuth } from '../context/AuthContext';
 
 
@@ -36,20 +36,12 @@ export default function CreateVehiclePage() {
 
     useEffect(() => {
         const fetchData = async () => {
-            const categoryResponse = await categoriesApi.getAll();
-            setCategories(categoryResponse.data);
-
-            const factoryResponse = await factoriesApi.getAll();
-            setFactories(factoryResponse.data);
-
-            const chassisResponse = await chassisApi.getAll();
-            setChassis(chassisResponse.data);
-
-            const wheelFormulaResponse = await wheelFormulasApi.getAll();
-            setWheelFormulas(wheelFormulaResponse.data);
-
-            const engineResponse = await enginesApi.getAll();
-            setEngines(engineResponse.data);
+            const { data } = await catalogApi.getBootstrap();
+            setCategories(data.categories);
+            setFactories(data.factories);
+            setChassis(data.chassis);
+            setWheelFormulas(data.wheel_formulas);
+            setEngines(data.engines);
         }
         fetchData()
     }, [])
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { Container, Card } from 'react-bootstrap'
-import { newsApi } from '../api'
+import { newsApi, imageUrl } from '../api'
 
 
 export default function NewsPage() {
@@ -39,7 +39,7 @@ export default function NewsPage() {
                         <Card.Title>{item.title}</Card.Title>
                         <Card.Img
                             variant="top"
-                            src={`http://localhost:8000/images/news/${item.news_id}`}
+                            src={imageUrl('news', item.news_id, item.image_path, 'medium')}
                             alt={item.title}
                             style={{ height: '200px', objectFit: 'cover' }}
                         />
@@ -1,7 +1,7 @@
 import { useParams, Link } from 'react-router-dom'
 import { useEffect, useState } from 'react'
 import { Container, Row, Col, Image, Button, Spinner } from 'react-bootstrap'
-import { vehiclesApi, categoriesApi, enginesApi, chassisApi, wheelFormulasApi, factoriesApi, priceListsApi } from '../api'
+import { vehiclesApi, imageUrl } from '../api'
 import { useCart } from '../context/CartContext'
 import { useAuth } from '../context/AuthContext'
 
@@ -13,39 +13,14 @@ export default function VehiclePage() {
     const { user } = useAuth();
     const { addToCart } = useCart()
 
-    const [category, setCategory] = useState(null);
-    const [engine, setEngine] = useState(null);
-    const [chassis, setChassis] = useState(null);
-    const [wheelFormula, setWheelFormula] = useState(null);
-    const [factory, setFactory] = useState(null);
-    const [priceList, setPriceList] = useState(null);
 
     const [loading, setLoading] = useState(true)
 
 
     useEffect(() => {
         const fetchData = async () => {
-            const vehicleResponse = await vehiclesApi.getById(id)
-            const vehicleData = vehicleResponse.data
-            setTransport(vehicleData)
-
-            const categoryResponse = await categoriesApi.getById(vehicleData.category_id)
-            setCategory(categoryResponse.data);
-            
-            const engineResponse = await enginesApi.getById(vehicleData.engine_id);
-            setEngine(engineResponse.data);
-
-            const chassisResponse = await chassisApi.getById(vehicleData.chassis_id);
-            setChassis(chassisResponse.data);
-
-            const wheelFormulaResponse = await wheelFormulasApi.getById(vehicleData.wheel_formula_id);
-            setWheelFormula(wheelFormulaResponse.data);
-
-            const factoryResponse = await factoriesApi.getById(vehicleData.factory_id);
-            setFactory(factoryResponse.data);
-
-            const priceListResponse = await priceListsApi.getByVehicleId(id);
-            setPriceList(priceListResponse.data[0]);
+            const vehicleResponse = await vehiclesApi.getFull(id)
+            setTransport(vehicleResponse.data)
 
             setLoading(false)
         }
@@ -57,8 +32,8 @@ export default function VehiclePage() {
             id: transport.vehicle_id,
             title: transport.title,
             description: transport.description,
-            price: priceList.price,
-            imageUrl: `http://localhost:8000/images/vehicles/${transport.vehicle_id}`,
+            price: transport.current_price,
+            imageUrl: imageUrl('vehicles', transport.vehicle_id, transport.image_path, 'thumb'),
         })
     }
 
@@ -70,7 +45,7 @@ export default function VehiclePage() {
                 <Col md={4}>
                     <div style={{ border: '1px solid #ccc', padding: '10px' }}>
                         <Image
-                        src={`http://localhost:8000/images/vehicles/${transport.vehicle_id}`}
+                        src={imageUrl('vehicles', transport.vehicle_id, transport.image_path, 'large')}
                         alt={transport.title}
                         className="img-fluid"
                         />
@@ -80,14 +55,14 @@ export default function VehiclePage() {
                 <Col md={8}>
                     <h3>{transport.title}</h3>
                     <p>{transport.description}</p>
-                    <p><strong>Категория:</strong> {category.name}</p>
-                    <p><strong>Шасси:</strong> {chassis.name}</p>
-                    <p><strong>Производитель:</strong> {factory.name}</p>
-                    <p><strong>Двигатель:</strong> {engine.name}</p>
-                    <p><strong>Колесная формула:</strong> {wheelFormula.name}</p>
-
-                    <p><strong>Срок поставки:</strong> {new Date(priceList.delivery_time).toLocaleDateString('ru-RU')}</p>
-                    <p><strong>Цена:</strong> {priceList.price}</p>
+                    <p><strong>Категория:</strong> {transport.category?.name}</p>
+                    <p><strong>Шасси:</strong> {transport.chassis?.name}</p>
+                    <p><strong>Производитель:</strong> {transport.factory?.name}</p>
+                    <p><strong>Двигатель:</strong> {transport.engine?.name}</p>
+                    <p><strong>Колесная формула:</strong> {transport.wheel_formula?.name}</p>
+
+                    <p><strong>Срок поставки:</strong> {transport.current_delivery_time ? new Date(transport.current_delivery_time).toLocaleDateString('ru-RU') : '—'}</p>
+                    <p><strong>Цена:</strong> {transport.current_price ?? '—'}</p>
 
                     {user ? (
                         <Link to="/cart">
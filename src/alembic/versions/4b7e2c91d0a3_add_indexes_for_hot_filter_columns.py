@@ -0,0 +1,57 @@
+"""Add indexes for hot filter columns
+
+Revision ID: 4b7e2c91d0a3
+Revises: 860e99190def
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2c91d0a3'
+down_revision: Union[str, None] = '860e99190def'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Vehicles: filter by category with keyset paging, "my vehicles"
+    op.create_index('ix_vehicles_category_id_vehicle_id', 'vehicles', ['category_id', 'vehicle_id'], unique=False)
+    op.create_index('ix_vehicles_user_id', 'vehicles', ['user_id'], unique=False)
+
+    # Price list: latest price per vehicle, prices by user
+    op.create_index('ix_price_list_vehicle_id_price_id', 'price_list', ['vehicle_id', sa.text('price_id DESC')], unique=False)
+    op.create_index('ix_price_list_user_id', 'price_list', ['user_id'], unique=False)
+
+    # Requests: filter by user and status
+    op.create_index('ix_requests_user_id', 'requests', ['user_id'], unique=False)
+    op.create_index('ix_requests_status', 'requests', ['status'], unique=False)
+
+    # Requisitioned goods: the primary key starts with request_id, lookups by vehicle need their own index
+    op.create_index('ix_requisitioned_goods_vehicle_id', 'requisitioned_goods', ['vehicle_id'], unique=False)
+
+    # News: feed ordered by publication date, news by user
+    op.create_index('ix_news_publication_date_news_id', 'news', ['publication_date', 'news_id'], unique=False)
+    op.create_index('ix_news_user_id', 'news', ['user_id'], unique=False)
+
+    # Token blacklist: expired token cleanup and revocation filter refresh
+    op.create_index('ix_token_blacklist_expires_at', 'token_blacklist', ['expires_at'], unique=False)
+    op.create_index('ix_token_blacklist_revoked_at', 'token_blacklist', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_blacklist_revoked_at', table_name='token_blacklist')
+    op.drop_index('ix_token_blacklist_expires_at', table_name='token_blacklist')
+    op.drop_index('ix_news_user_id', table_name='news')
+    op.drop_index('ix_news_publication_date_news_id', table_name='news')
+    op.drop_index('ix_requisitioned_goods_vehicle_id', table_name='requisitioned_goods')
+    op.drop_index('ix_requests_status', table_name='requests')
+    op.drop_index('ix_requests_user_id', table_name='requests')
+    op.drop_index('ix_price_list_user_id', table_name='price_list')
+    op.drop_index('ix_price_list_vehicle_id_price_id', table_name='price_list')
+    op.drop_index('ix_vehicles_user_id', table_name='vehicles')
+    op.drop_index('ix_vehicles_category_id_vehicle_id', table_name='vehicles')
@@ -0,0 +1,49 @@
+"""Add current price projection to vehicles
+
+Revision ID: 9d1f5a3c7e20
+Revises: 4b7e2c91d0a3
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1f5a3c7e20'
+down_revision: Union[str, None] = '4b7e2c91d0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Latest price of each vehicle, maintained by PriceListRepository
+    op.add_column('vehicles', sa.Column('current_price_id', sa.Integer(), nullable=True))
+    op.add_column('vehicles', sa.Column('current_price', sa.Integer(), nullable=True))
+    op.add_column('vehicles', sa.Column('current_delivery_time', sa.DateTime(), nullable=True))
+    op.create_index('ix_vehicles_current_price', 'vehicles', ['current_price'], unique=False)
+
+    # Backfill from the existing price list
+    op.execute(
+        """
+        UPDATE vehicles AS v
+        SET current_price_id = p.price_id,
+            current_price = p.price,
+            current_delivery_time = p.delivery_time
+        FROM (
+            SELECT DISTINCT ON (vehicle_id) price_id, vehicle_id, price, delivery_time
+            FROM price_list
+            ORDER BY vehicle_id, price_id DESC
+        ) AS p
+        WHERE p.vehicle_id = v.vehicle_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicles_current_price', table_name='vehicles')
+    op.drop_column('vehicles', 'current_delivery_time')
+    op.drop_column('vehicles', 'current_price')
+    op.drop_column('vehicles', 'current_price_id')
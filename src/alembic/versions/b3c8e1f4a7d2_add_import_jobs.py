@@ -0,0 +1,44 @@
+"""Add import_jobs table
+
+Revision ID: b3c8e1f4a7d2
+Revises: 9d1f5a3c7e20
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c8e1f4a7d2'
+down_revision: Union[str, None] = '9d1f5a3c7e20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Vehicle import job state shared by all workers
+    op.create_table(
+        'import_jobs',
+        sa.Column('job_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('created', sa.Integer(), nullable=False),
+        sa.Column('updated', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON(), nullable=False),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id'),
+    )
+    op.create_index('ix_import_jobs_created_at', 'import_jobs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_created_at', table_name='import_jobs')
+    op.drop_table('import_jobs')
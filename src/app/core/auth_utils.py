@@ -1,20 +1,184 @@
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import uuid
+import asyncpg
 from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 from fastapi import HTTPException, status
 from typing import Optional
+from werkzeug.security import generate_password_hash, check_password_hash
 
 from ..models import User, TokenBlacklist
 from .config import settings
+from .database import SessionLocal
+from .cache import TTLCache
+from .bloom_filter import BloomFilter
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Кэш результатов проверки отзыва токенов (jti -> bool) и данных пользователей (user_id -> dict)
+revoked_tokens_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_SIZE)
+users_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_SIZE)
+
+# Канал PostgreSQL NOTIFY, через который воркеры сообщают друг другу об отзыве токенов ("token:<jti>")
+# и изменении пользователей ("user:<id>")
+AUTH_INVALIDATION_CHANNEL = "auth_invalidation"
+
+
+class AuthInvalidationListener:
+    """
+    Подписка воркера на канал AUTH_INVALIDATION_CHANNEL.
+    При AUTH_SHARED_INVALIDATION кэши и отрицательные ответы Bloom-фильтра используются, только пока
+    подписка активна: изменение в другом воркере доходит за время доставки NOTIFY. Пока подписки нет
+    (старт, обрыв соединения, не PostgreSQL), каждая проверка идет в БД.
+    """
+
+    def __init__(self):
+        self.live = False
+
+    def caches_trusted(self) -> bool:
+        return self.live or not settings.AUTH_SHARED_INVALIDATION
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        kind, _, value = payload.partition(":")
+        if kind == "token":
+            revoked_tokens_cache.set(value, True)
+            revoked_tokens_filter.add(value)
+        elif kind == "user" and value.isdigit():
+            users_cache.delete(int(value))
+
+    async def run(self) -> None:
+        """Поддержание подписки с переподключением (запускается из lifespan приложения)"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    host=settings.DB_HOST, port=settings.DB_PORT, user=settings.DB_USER,
+                    password=settings.DB_PASS, database=settings.DB_NAME,
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(AUTH_INVALIDATION_CHANNEL, self._on_notification)
+
+                # Пока подписки не было, уведомления могли потеряться: локальные кэши сбрасываются,
+                # фильтр догружает токены, отозванные за это время
+                revoked_tokens_cache.clear()
+                users_cache.clear()
+                async with SessionLocal() as db:
+                    await revoked_tokens_filter.refresh(db)
+                self.live = True
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Auth invalidation listener error: {e}")
+            finally:
+                self.live = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(settings.AUTH_INVALIDATION_RECONNECT_SECONDS)
+
+
+auth_invalidation_listener = AuthInvalidationListener()
+
+
+async def notify_auth_invalidation(db: AsyncSession, payload: str) -> None:
+    """Уведомление остальных воркеров; доставляется при фиксации транзакции db"""
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(select(func.pg_notify(AUTH_INVALIDATION_CHANNEL, payload)))
+
+
+class RevokedTokensFilter:
+    """
+    Bloom-фильтр jti отозванных токенов.
+    Если jti нет в фильтре, токен точно не отозван и запрос к БД не нужен.
+    Пока фильтр не загружен, любой токен считается возможно отозванным.
+    """
+
+    # Запас по времени при подгрузке новых записей (расхождение часов между воркерами)
+    REFRESH_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self):
+        self._bloom: Optional[BloomFilter] = None
+        self._synced_at: Optional[datetime] = None
+        self._rebuilding = False
+        self._added_during_rebuild = []
+
+    def might_contain(self, jti: str) -> bool:
+        return self._bloom is None or jti in self._bloom
+
+    def add(self, jti: str) -> None:
+        if self._bloom is not None:
+            self._bloom.add(jti)
+        if self._rebuilding:
+            self._added_during_rebuild.append(jti)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Полная пересборка фильтра из неистекших записей черного списка"""
+        self._rebuilding = True
+        self._added_during_rebuild = []
+        try:
+            synced_at = datetime.utcnow()
+            result = await db.execute(
+                select(TokenBlacklist.token_jti).where(TokenBlacklist.expires_at >= synced_at)
+            )
+            jtis = result.scalars().all()
+
+            bloom = BloomFilter(
+                max(settings.REVOCATION_FILTER_CAPACITY, len(jtis) * 2),
+                settings.REVOCATION_FILTER_ERROR_RATE
+            )
+            for jti in jtis:
+                bloom.add(jti)
+            for jti in self._added_during_rebuild:
+                bloom.add(jti)
+
+            self._bloom = bloom
+            self._synced_at = synced_at
+        finally:
+            self._rebuilding = False
+            self._added_during_rebuild = []
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Подгрузка токенов, отозванных с момента последней синхронизации (в том числе другими воркерами)"""
+        if self._bloom is None or self._bloom.is_full():
+            await self.rebuild(db)
+            return
+
+        synced_at = datetime.utcnow()
+        result = await db.execute(
+            select(TokenBlacklist.token_jti)
+            .where(TokenBlacklist.revoked_at >= self._synced_at - self.REFRESH_OVERLAP)
+        )
+        for jti in result.scalars().all():
+            self._bloom.add(jti)
+        self._synced_at = synced_at
+
+
+revoked_tokens_filter = RevokedTokensFilter()
+
+# Пул потоков для PBKDF2: хэширование не блокирует event loop, число потоков ограничено
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+async def hash_password(password: str) -> str:
+    """Хэширование пароля в пуле потоков"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, generate_password_hash, password)
+
+async def verify_password(user: User, password: str) -> bool:
+    """Проверка пароля пользователя в пуле потоков"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, check_password_hash, user.password_hash, password)
+
 def create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создание JWT токена"""
     to_encode = data.copy()
@@ -40,24 +204,104 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Аутентификация пользователя по email и паролю"""
     user = await get_user_by_email(db, email)
-    if not user or not user.verify_password(password):
+    if not user or not await verify_password(user, password):
         return None
     return user
 
 async def is_token_revoked(db: AsyncSession, jti: str) -> bool:
-    """Проверка, отозван ли токен"""
+    """
+    Проверка, отозван ли токен.
+    Отзыв необратим, поэтому положительный ответ из кэша верен всегда; отрицательные ответы фильтра и кэша
+    используются только при активной подписке на уведомления (см. AuthInvalidationListener)
+    """
+    trusted = auth_invalidation_listener.caches_trusted()
+    if trusted and not revoked_tokens_filter.might_contain(jti):
+        return False
+
+    revoked = revoked_tokens_cache.get(jti)
+    if revoked or (revoked is not None and trusted):
+        return revoked
+
     stmt = select(TokenBlacklist).where(TokenBlacklist.token_jti == jti)
     result = await db.execute(stmt)
-    return result.scalars().first() is not None
+    revoked = result.scalars().first() is not None
+    revoked_tokens_cache.set(jti, revoked)
+    return revoked
 
 async def revoke_token(db: AsyncSession, jti: str, expires_at: datetime) -> None:
     """Добавление токена в черный список"""
     token_blacklist = TokenBlacklist(token_jti=jti, expires_at=expires_at)
     db.add(token_blacklist)
+    await notify_auth_invalidation(db, f"token:{jti}")
+    await db.commit()
+    revoked_tokens_cache.set(jti, True)
+    revoked_tokens_filter.add(jti)
+
+async def get_user_by_id_cached(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Получение пользователя по id через кэш.
+    При попадании в кэш пользователь присоединяется к сессии без запроса к БД.
+    """
+    user_data = users_cache.get(user_id) if auth_invalidation_listener.caches_trusted() else None
+    if user_data is None:
+        result = await db.execute(select(User).where(User.user_id == user_id))
+        user = result.scalars().first()
+        if user is not None:
+            users_cache.set(user_id, {c.key: getattr(user, c.key) for c in User.__table__.columns})
+        return user
+
+    user = User(**user_data)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+async def invalidate_user_cache(db: AsyncSession, user_id: int) -> None:
+    """Сброс закэшированных данных пользователя после их изменения или удаления (во всех воркерах)"""
+    users_cache.delete(user_id)
+    await notify_auth_invalidation(db, f"user:{user_id}")
     await db.commit()
 
-async def cleanup_expired_tokens(db: AsyncSession) -> None:
-    """Очистка устаревших записей из черного списка токенов"""
-    stmt = delete(TokenBlacklist).where(TokenBlacklist.expires_at < datetime.utcnow())
-    await db.execute(stmt)
-    await db.commit() 
\ No newline at end of file
+async def cleanup_expired_tokens(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Очистка устаревших записей из черного списка токенов пачками по batch_size"""
+    total_deleted = 0
+    while True:
+        expired_ids = (
+            select(TokenBlacklist.id)
+            .where(TokenBlacklist.expires_at < datetime.utcnow())
+            .limit(batch_size)
+        )
+        result = await db.execute(delete(TokenBlacklist).where(TokenBlacklist.id.in_(expired_ids)))
+        await db.commit()
+
+        total_deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return total_deleted
+
+async def run_token_cleanup_scheduler() -> None:
+    """Периодическая очистка черного списка токенов (запускается из lifespan приложения)"""
+    while True:
+        await asyncio.sleep(settings.TOKEN_CLEANUP_INTERVAL_SECONDS)
+        try:
+            async with SessionLocal() as db:
+                await cleanup_expired_tokens(db, settings.TOKEN_CLEANUP_BATCH_SIZE)
+                # Пересборка фильтра убирает из него истекшие токены
+                await revoked_tokens_filter.rebuild(db)
+        except Exception as e:
+            print(f"Token cleanup error: {e}")
+
+async def load_revoked_tokens_filter() -> None:
+    """Начальная загрузка фильтра отозванных токенов при старте приложения"""
+    try:
+        async with SessionLocal() as db:
+            await revoked_tokens_filter.rebuild(db)
+    except Exception as e:
+        print(f"Revoked tokens filter load error: {e}")
+
+async def run_revoked_tokens_filter_refresher() -> None:
+    """Периодическая подгрузка в фильтр токенов, отозванных другими воркерами"""
+    while True:
+        await asyncio.sleep(settings.REVOCATION_FILTER_REFRESH_SECONDS)
+        try:
+            async with SessionLocal() as db:
+                await revoked_tokens_filter.refresh(db)
+        except Exception as e:
+            print(f"Revoked tokens filter refresh error: {e}") 
\ No newline at end of file
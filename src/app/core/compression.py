@@ -0,0 +1,179 @@
+from typing import Dict, Iterable, Optional
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Ответы с этими кодами не имеют тела или содержат часть представления
+UNCOMPRESSED_STATUSES = {204, 206, 304}
+
+
+# Кодирования в порядке предпочтения сервера (используется только при равных q)
+SERVER_ENCODINGS = ("br", "gzip")
+
+
+def _parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = min(max(float(param[2:]), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+# Выбор кодирования по Accept-Encoding: наибольший q среди available, при равных q - порядок available.
+# "*" задает q для неперечисленных кодирований (включая identity), q=0 означает запрет.
+# None - отдавать без сжатия: identity явно предпочтительнее (больший q) или подходящего сжатия нет
+# (даже при identity;q=0 ответ отдается без сжатия, а не 406)
+def choose_encoding(accept_encoding: str, available: Iterable[str] = SERVER_ENCODINGS) -> Optional[str]:
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*")
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        if encoding == "br" and brotli is None:
+            continue
+        quality = accepted.get(encoding, wildcard if wildcard is not None else 0.0)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    identity_quality = accepted.get("identity", wildcard)
+    if best is None or (identity_quality is not None and identity_quality > best_quality):
+        return None
+    return best
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        # Для потоковых ответов каждая часть сбрасывается сразу, чтобы клиент получал данные без задержки
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.finish() if last else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов gzip/brotli по Accept-Encoding.
+    Сжимаются только типы из content_types (точное совпадение или префикс, оканчивающийся на "/")
+    и ответы не меньше minimum_size байт; потоковые ответы сжимаются по частям.
+    Уже закодированные ответы (сжатая статика), частичные ответы и Cache-Control: no-transform не трогаются.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json", "text/"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def is_compressible(self, content_type: str) -> bool:
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        return any(
+            media_type.startswith(rule) if rule.endswith("/") else media_type == rule
+            for rule in self.content_types
+        )
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Откладывает заголовки ответа до первой части тела, чтобы решить, сжимать ли его"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor = None
+        self._passthrough = False
+
+    def _should_compress(self, headers: MutableHeaders) -> bool:
+        return (
+            self._start["status"] not in UNCOMPRESSED_STATUSES
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and self.middleware.is_compressible(headers.get("content-type", ""))
+        )
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is None:
+            headers = MutableHeaders(raw=self._start["headers"])
+            if not self._should_compress(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+
+            self._compressor = self.middleware.compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            # Сжатое представление отличается побайтно: сильный ETag становится слабым
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            body = self._compressor.compress(body, last=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self._send(self._start)
+        else:
+            body = self._compressor.compress(body, last=not more_body)
+
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import List, Literal, Optional, Union
 import os
+import tempfile
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -11,6 +13,98 @@ class Settings(BaseSettings):
     DB_NAME: str
     SECRET_KEY: str
 
+    # Настройки пула соединений и движка БД
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: Union[bool, Literal["debug"]] = False
+    # Кэши подготовленных запросов asyncpg и диалекта SQLAlchemy; 0 - для pgbouncer в режиме transaction
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Фоновая очистка черного списка токенов
+    TOKEN_CLEANUP_INTERVAL_SECONDS: int = 3600
+    TOKEN_CLEANUP_BATCH_SIZE: int = 1000
+
+    # Кэш проверок отзыва токенов и пользователей в get_current_user
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    # Рассылка сбросов кэшей между воркерами через PostgreSQL LISTEN/NOTIFY; без активной подписки кэши
+    # не используются. false - только для одного воркера: тогда кэши доверяются до истечения TTL
+    AUTH_SHARED_INVALIDATION: bool = True
+    AUTH_INVALIDATION_RECONNECT_SECONDS: int = 5
+
+    # Bloom-фильтр отозванных токенов
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_FILTER_REFRESH_SECONDS: int = 30
+
+    # Число потоков для хэширования и проверки паролей
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Кэш справочников (категории, шасси, двигатели, заводы, колесные формулы). Кэш у каждого воркера свой:
+    # после изменения другие воркеры отдают прежние данные и ETag до REFERENCE_CACHE_TTL_SECONDS секунд
+    REFERENCE_CACHE_TTL_SECONDS: int = 30
+    REFERENCE_CACHE_MAX_AGE: int = 60
+
+    # Максимум строк в одном запросе пакетного создания/обновления (ТС, прайс-лист)
+    MAX_BATCH_SIZE: int = 5000
+
+    # Импорт техники из CSV/NDJSON
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+    IMPORT_MAX_BYTES: int = 100 * 1024 * 1024
+    IMPORT_JOB_TTL_SECONDS: int = 24 * 60 * 60
+    IMPORT_JOB_STALE_SECONDS: int = 600
+
+    # Загрузка изображений
+    IMAGE_UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    IMAGE_UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+
+    # Варианты изображений (thumb/medium/large, WebP)
+    IMAGE_VARIANT_WORKERS: int = 2
+    IMAGE_JPEG_QUALITY: int = 85
+    IMAGE_WEBP_QUALITY: int = 80
+
+    # Кэширование изображений: max-age для неверсионированных адресов и
+    # кэш id -> метаданные изображения в памяти процесса
+    IMAGE_CACHE_MAX_AGE: int = 60
+    IMAGE_METADATA_TTL_SECONDS: int = 60
+    IMAGE_METADATA_MAX_SIZE: int = 10000
+
+    # Хранилище изображений: local - каталог IMAGE_STORAGE_ROOT (раздается как /static/images),
+    # s3 - S3-совместимое хранилище с локальным кэшем прочитанных файлов в IMAGE_S3_CACHE_DIR
+    IMAGE_STORAGE_BACKEND: Literal["local", "s3"] = "local"
+    IMAGE_STORAGE_ROOT: str = os.path.join(BASE_DIR, "static", "images")
+    # Временные файлы загрузок: та же файловая система, что и IMAGE_STORAGE_ROOT, но вне /static
+    IMAGE_STORAGE_TMP_DIR: str = os.path.join(BASE_DIR, "tmp", "images")
+    IMAGE_S3_BUCKET: str = ""
+    IMAGE_S3_PREFIX: str = ""
+    IMAGE_S3_ENDPOINT_URL: Optional[str] = None
+    IMAGE_S3_REGION: Optional[str] = None
+    IMAGE_S3_ACCESS_KEY: Optional[str] = None
+    IMAGE_S3_SECRET_KEY: Optional[str] = None
+    IMAGE_S3_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "image-cache")
+
+    # Раздача /static: создание .br/.gz рядом со сжимаемыми файлами не меньше STATIC_COMPRESS_MIN_SIZE байт
+    # и кэш в памяти для файлов не больше STATIC_MEMORY_CACHE_MAX_FILE_SIZE байт
+    STATIC_PRECOMPRESS: bool = True
+    STATIC_COMPRESS_MIN_SIZE: int = 512
+    STATIC_MEMORY_CACHE_MAX_FILE_SIZE: int = 64 * 1024
+    STATIC_MEMORY_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    # Максимум проиндексированных файлов /static (метаданные, ETag, сжатые копии) на воркер
+    STATIC_INDEX_MAX_ENTRIES: int = 10000
+
+    # Сжатие ответов API: минимальный размер тела, сжимаемые типы (точные или префиксы на "/") и уровни сжатия
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+        "image/svg+xml", "text/",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
     @property
     def DATABASE_URL_asyncpg(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -4,11 +4,42 @@ from .config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL_asyncpg
 
-engine = create_async_engine(url=SQLALCHEMY_DATABASE_URL, echo=True)
+def make_engine(statement_cache_size: int = settings.DB_STATEMENT_CACHE_SIZE):
+    """
+    Движок с пулом соединений из настроек.
+    statement_cache_size задает оба кэша подготовленных запросов: собственный кэш asyncpg и кэш диалекта
+    SQLAlchemy (prepared_statement_cache_size), который asyncpg не использует; 0 отключает оба
+    """
+    return create_async_engine(
+        url=SQLALCHEMY_DATABASE_URL,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": statement_cache_size,
+        },
+    )
+
+engine = make_engine()
 SessionLocal = async_sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
 
 Base = declarative_base()
 
+def get_pool_stats() -> dict:
+    """Текущее состояние пула соединений"""
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
 async def recreate_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -7,7 +7,7 @@ from datetime import datetime
 
 from .database import SessionLocal
 from ..models import User
-from .auth_utils import ALGORITHM, is_token_revoked
+from .auth_utils import ALGORITHM, is_token_revoked, get_user_by_id_cached
 from .config import settings
 from sqlalchemy.future import select
 
@@ -55,9 +55,7 @@ async def get_current_user(
         if await is_token_revoked(db, jti):
             raise credentials_exception
             
-        stmt = select(User).where(User.user_id == int(user_id))
-        result = await db.execute(stmt)
-        user = result.scalars().first()
+        user = await get_user_by_id_cached(db, int(user_id))
         
         if user is None or not user.is_active:
             raise credentials_exception
@@ -0,0 +1,36 @@
+from fastapi import Request, Response, status
+from typing import Optional
+
+from .config import settings
+
+
+def conditional_response(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Установка заголовков ETag и Cache-Control.
+    Если клиент прислал совпадающий If-None-Match, возвращается готовый ответ 304.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    response.headers.update(headers)
+
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+# Совпадает ли ETag с одним из значений If-None-Match (слабое сравнение)
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+# Справочники меняются редко: короткий max-age, затем повторная проверка по ETag
+REFERENCE_CACHE_CONTROL = f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE}, must-revalidate"
+
+# Изображения по постоянному адресу: короткий max-age и повторная проверка по ETag
+IMAGE_CACHE_CONTROL = f"public, max-age={settings.IMAGE_CACHE_MAX_AGE}, must-revalidate"
+
+# Версионированные адреса (имя файла по хэшу содержимого) никогда не меняются
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
@@ -0,0 +1,40 @@
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Type
+
+from .responses import FastJSONResponse
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+async def paginate(
+    repository,
+    db: AsyncSession,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    rows_schema: Optional[Type[BaseModel]] = None,
+    **page_options
+):
+    """
+    Получение списка записей.
+    Если передан cursor, используется keyset-пагинация (пустая строка - первая страница),
+    а курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Иначе используется OFFSET/LIMIT; если передана схема rows_schema, строки выбираются без ORM-объектов
+    и сразу кодируются в FastJSONResponse.
+    """
+    if cursor is None:
+        if rows_schema is not None:
+            return FastJSONResponse(await repository.get_rows(db, rows_schema, skip, limit))
+        return await repository.get_all(db, skip, limit)
+
+    try:
+        items, next_cursor = await repository.get_page(db, cursor=cursor, limit=limit, **page_options)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
@@ -0,0 +1,13 @@
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+from typing import Any
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ, кодируемый сериализатором pydantic-core (Rust) вместо json.dumps.
+    Понимает datetime, Enum, UUID и т.п., поэтому строки из БД можно отдавать без jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
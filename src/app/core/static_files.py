@@ -0,0 +1,281 @@
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional, Tuple
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+from .config import settings
+from .compression import choose_encoding
+from .http_cache import etag_matches, IMMUTABLE_CACHE_CONTROL
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Типы, которые имеет смысл сжимать (изображения JPEG/PNG/WebP уже сжаты)
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/xml",
+    "image/svg+xml", "image/x-icon", "image/vnd.microsoft.icon", "application/manifest+json",
+)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Имя (без расширения) с хэшем содержимого - содержимое по адресу не меняется:
+# sha256 загрузок и их вариантов (<64 hex>, <64 hex>_thumb) или хэш сборщика перед расширением
+# (app.3f2a1b9c.js, app-3f2a1b9c.js); хэш сборщика должен содержать букву, чтобы не принять за него дату
+HASHED_NAME = re.compile(r"^[0-9a-f]{64}(?:_[a-z]+)?$|[.-](?=[0-9]*[a-f])[0-9a-f]{8,}$")
+
+# Файлы без хэша в имени каждый раз проверяются по ETag
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _file_etag(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()[:32]
+
+
+# Сжатая копия рядом с файлом; пересоздается, если старше оригинала
+def _build_sibling(path: Path, encoding: str, suffix: str) -> Optional[Path]:
+    if encoding == "br" and brotli is None:
+        return None
+
+    sibling = path.with_name(path.name + suffix)
+    if sibling.exists() and sibling.stat().st_mtime >= path.stat().st_mtime:
+        return sibling
+
+    data = path.read_bytes()
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=11)
+    else:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    # Сжатие не дало выигрыша - отдаем оригинал
+    if len(compressed) >= len(data):
+        return None
+
+    tmp = sibling.with_name(sibling.name + ".part")
+    tmp.write_bytes(compressed)
+    os.replace(tmp, sibling)
+    return sibling
+
+
+class _MemoryCache:
+    """LRU-кэш содержимого небольших файлов с ограничением по суммарному размеру"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: "OrderedDict[Path, bytes]" = OrderedDict()
+
+    def get(self, path: Path) -> Optional[bytes]:
+        data = self._data.get(path)
+        if data is not None:
+            self._data.move_to_end(path)
+        return data
+
+    def discard(self, path: Path) -> None:
+        data = self._data.pop(path, None)
+        if data is not None:
+            self.size -= len(data)
+
+    def set(self, path: Path, data: bytes) -> None:
+        self.discard(path)
+        self._data[path] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
+
+
+# Разбор одного диапазона "bytes=a-b" / "bytes=a-" / "bytes=-n"; None - отдать файл целиком
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    units, _, spec = header.partition("=")
+    if units.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else size - 1
+        else:
+            first, last = size - int(end), size - 1
+    except ValueError:
+        return None
+    first, last = max(first, 0), min(last, size - 1)
+    if first > last:
+        raise ValueError("Range not satisfiable")
+    return first, last
+
+
+class StaticAssets:
+    """
+    Раздача статических файлов.
+    - при старте для сжимаемых типов рядом создаются .br/.gz, отдаются по Accept-Encoding;
+    - сильный ETag по SHA-256 содержимого и ответ 304 на If-None-Match;
+    - Cache-Control: immutable для файлов с хэшем в имени;
+    - запросы Range (для несжатого представления);
+    - небольшие файлы держатся в памяти (LRU), диск на каждый запрос не читается.
+    Файлы, добавленные после старта (загруженные изображения), индексируются при первом обращении;
+    на каждый запрос выполняется только stat (в отдельном потоке), чтобы заметить изменение или удаление файла.
+    Индекс хранит только существующие файлы и ограничен STATIC_INDEX_MAX_ENTRIES записями (LRU).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory).resolve()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._memory = _MemoryCache(settings.STATIC_MEMORY_CACHE_MAX_BYTES)
+
+    # Индексация файла: тип, размер, ETag и сжатые копии
+    def _index(self, relative: str) -> Optional[dict]:
+        path = (self.directory / relative).resolve()
+        if not path.is_relative_to(self.directory) or not path.is_file():
+            return None
+
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        stat = path.stat()
+        etag = _file_etag(path)
+        representations = {}
+        compressible = _is_compressible(media_type)
+        if compressible and settings.STATIC_PRECOMPRESS and stat.st_size >= settings.STATIC_COMPRESS_MIN_SIZE:
+            for encoding, suffix in ENCODINGS:
+                sibling = _build_sibling(path, encoding, suffix)
+                if sibling is not None:
+                    representations[encoding] = (sibling, sibling.stat().st_size)
+
+        return {
+            "path": path,
+            "size": stat.st_size,
+            "media_type": media_type,
+            "etag": etag,
+            "mtime": stat.st_mtime,
+            "last_modified": formatdate(stat.st_mtime, usegmt=True),
+            "cache_control": IMMUTABLE_CACHE_CONTROL if HASHED_NAME.search(path.stem.lower()) else REVALIDATE_CACHE_CONTROL,
+            "representations": representations,
+            "vary": compressible,
+        }
+
+    def build(self) -> None:
+        """Предварительное сжатие и индексация сжимаемых файлов (вызывается при старте в отдельном потоке)"""
+        for path in self.directory.rglob("*"):
+            if not path.is_file() or path.suffix in (".br", ".gz", ".part"):
+                continue
+            if not _is_compressible(mimetypes.guess_type(path.name)[0] or ""):
+                continue
+            relative = path.relative_to(self.directory).as_posix()
+            entry = self._index(relative)
+            if entry is not None:
+                self._remember(relative, entry)
+
+    def _remember(self, relative: str, entry: dict) -> None:
+        self._entries[relative] = entry
+        self._entries.move_to_end(relative)
+        while len(self._entries) > settings.STATIC_INDEX_MAX_ENTRIES:
+            self._forget(next(iter(self._entries)))
+
+    def _forget(self, relative: str) -> None:
+        entry = self._entries.pop(relative, None)
+        if entry is not None:
+            self._memory.discard(entry["path"])
+            for path, _ in entry["representations"].values():
+                self._memory.discard(path)
+
+    async def _get_entry(self, relative: str) -> Optional[dict]:
+        entry = self._entries.get(relative)
+        if entry is not None:
+            try:
+                stat = await asyncio.to_thread(os.stat, entry["path"])
+            except FileNotFoundError:
+                stat = None
+            if stat is None or stat.st_mtime != entry["mtime"] or stat.st_size != entry["size"]:
+                self._forget(relative)
+                entry = None
+            else:
+                self._entries.move_to_end(relative)
+
+        if entry is None:
+            entry = await asyncio.to_thread(self._index, relative)
+            if entry is not None:
+                self._remember(relative, entry)
+        return entry
+
+    async def _read(self, path: Path, size: int) -> Optional[bytes]:
+        if size > settings.STATIC_MEMORY_CACHE_MAX_FILE_SIZE:
+            return None
+        data = self._memory.get(path)
+        if data is None:
+            data = await asyncio.to_thread(path.read_bytes)
+            self._memory.set(path, data)
+        return data
+
+    async def serve(self, request: Request, relative: str) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return Response(status_code=status.HTTP_405_METHOD_NOT_ALLOWED, headers={"Allow": "GET, HEAD"})
+
+        entry = await self._get_entry(relative.lstrip("/"))
+        if entry is None:
+            return Response("Not Found", status_code=status.HTTP_404_NOT_FOUND, media_type="text/plain")
+
+        # Диапазоны отдаются только для несжатого представления
+        range_header = request.headers.get("range")
+        encoding = None
+        if not range_header:
+            encoding = choose_encoding(request.headers.get("accept-encoding", ""), entry["representations"])
+
+        etag = f'"{entry["etag"]}-{encoding}"' if encoding else f'"{entry["etag"]}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": entry["last_modified"],
+            "Cache-Control": entry["cache_control"],
+            "Accept-Ranges": "bytes",
+        }
+        if entry["vary"]:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        path, size = entry["representations"][encoding] if encoding else (entry["path"], entry["size"])
+        data = await self._read(path, size)
+        if data is None:
+            # Большие файлы - с диска; FileResponse сам обрабатывает Range и If-Range
+            return FileResponse(path, media_type=entry["media_type"], headers=headers)
+
+        if range_header and request.headers.get("if-range", etag) in (etag, entry["last_modified"]):
+            try:
+                byte_range = _parse_range(range_header, size)
+            except ValueError:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={**headers, "Content-Range": f"bytes */{size}"},
+                )
+            if byte_range is not None:
+                first, last = byte_range
+                headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+                return Response(
+                    data[first:last + 1], status_code=status.HTTP_206_PARTIAL_CONTENT,
+                    media_type=entry["media_type"], headers=headers,
+                )
+
+        return Response(data, media_type=entry["media_type"], headers=headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        # Mount переносит префикс /static в root_path
+        response = await self.serve(request, scope["path"].removeprefix(scope.get("root_path", "")))
+        await response(scope, receive, send)
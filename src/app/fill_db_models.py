@@ -1,4 +1,4 @@
-from sqlalchemy import Text, ForeignKey, Integer, String, DateTime, Enum, Boolean
+from sqlalchemy import Text, ForeignKey, Integer, String, DateTime, Enum, Boolean, Index, JSON, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column, DeclarativeBase
 import enum
 import datetime
@@ -62,6 +62,10 @@ class Engine(Base):
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    __table_args__ = (
+        # Фильтр по категории с keyset-пагинацией по vehicle_id
+        Index("ix_vehicles_category_id_vehicle_id", "category_id", "vehicle_id"),
+    )
 
     vehicle_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -75,7 +79,12 @@ class Vehicle(Base):
     chassis_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("chassis.chassis_id", ondelete="CASCADE"), nullable=True)
     wheel_formula_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("wheel_formulas.wheel_formula_id", ondelete="CASCADE"), nullable=True)
     engine_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("engines.engine_id", ondelete="CASCADE"), nullable=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Текущая (последняя) цена из price_list, поддерживается PriceListRepository
+    current_price_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    current_price: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    current_delivery_time: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True)
 
     category: Mapped["Category"] = relationship("Category", backref="vehicles")
     factory: Mapped["Factory"] = relationship("Factory", backref="vehicles")
@@ -86,11 +95,15 @@ class Vehicle(Base):
 
 class PriceList(Base):
     __tablename__ = "price_list"
+    __table_args__ = (
+        # Поиск последней цены транспортного средства
+        Index("ix_price_list_vehicle_id_price_id", "vehicle_id", text("price_id DESC")),
+    )
 
     price_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     price: Mapped[int] = mapped_column(Integer, nullable=False)
     delivery_time: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
     vehicle_id: Mapped[int] = mapped_column(Integer, ForeignKey("vehicles.vehicle_id", ondelete="CASCADE"), nullable=False)
 
     vehicle: Mapped["Vehicle"] = relationship("Vehicle", backref="price_lists")
@@ -125,9 +138,9 @@ class Requests(Base):
 
     payment_method: Mapped[PaymentMethodEnum] = mapped_column(Enum(PaymentMethodEnum), nullable=False)
     delivery_type: Mapped[DeliveryTypeEnum] = mapped_column(Enum(DeliveryTypeEnum), nullable=False)
-    status: Mapped[RequestStatusEnum] = mapped_column(Enum(RequestStatusEnum), nullable=False)
+    status: Mapped[RequestStatusEnum] = mapped_column(Enum(RequestStatusEnum), nullable=False, index=True)
 
-    user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True, index=True)
 
     user: Mapped["User"] = relationship("User", backref="requests")
 
@@ -135,7 +148,7 @@ class TovaryVZayavke(Base):
     __tablename__ = "requisitioned_goods"
 
     request_id: Mapped[int] = mapped_column(Integer, ForeignKey("requests.request_id", ondelete="CASCADE"), primary_key=True)
-    vehicle_id: Mapped[int] = mapped_column(Integer, ForeignKey("vehicles.vehicle_id", ondelete="CASCADE"), primary_key=True)
+    vehicle_id: Mapped[int] = mapped_column(Integer, ForeignKey("vehicles.vehicle_id", ondelete="CASCADE"), primary_key=True, index=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
 
     request: Mapped["Requests"] = relationship("Requests", backref="tovary_v_zayavke")
@@ -143,6 +156,10 @@ class TovaryVZayavke(Base):
 
 class News(Base):
     __tablename__ = "news"
+    __table_args__ = (
+        # Лента новостей с keyset-пагинацией по дате публикации
+        Index("ix_news_publication_date_news_id", "publication_date", "news_id"),
+    )
 
     news_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -150,7 +167,7 @@ class News(Base):
     content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     image_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     image_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
 
     user: Mapped["User"] = relationship("User", backref="news")
 
@@ -159,5 +176,21 @@ class TokenBlacklist(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     token_jti: Mapped[str] = mapped_column(String, unique=True, nullable=False)
-    revoked_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, default=datetime.datetime.utcnow)
-    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
\ No newline at end of file
+    revoked_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, default=datetime.datetime.utcnow, index=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+# Состояние фоновых задач импорта техники (общее для всех воркеров)
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    job_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    detail: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, index=True)
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
\ No newline at end of file
@@ -0,0 +1,98 @@
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import asyncio
+import hashlib
+import os
+import tempfile
+
+from .core.config import settings
+from .image_variants import variant_keys
+from .storage import get_image_storage, content_key, key_from_image_path
+
+ALLOWED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.svg']
+
+
+# Проверка расширения загружаемого файла
+def get_extension(filename: Optional[str]) -> str:
+    file_extension = os.path.splitext(filename or "")[1].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Неподдерживаемый формат файла. Разрешены только .jpg, .jpeg, .png и .svg"
+        )
+    return file_extension
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Размер файла превышает {settings.IMAGE_UPLOAD_MAX_BYTES} байт"
+    )
+
+
+def _write_chunk(tmp, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    tmp.write(chunk)
+
+
+# Блокировка ключа до конца транзакции db: загрузка и удаление одного файла выполняются по очереди.
+# Без нее удаление могло бы проверить ссылки до фиксации записи, ссылающейся на тот же ключ, и удалить ее файл
+async def lock_image_key(db: AsyncSession, key: str) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+
+async def save_upload(db: AsyncSession, file: UploadFile, section: str) -> str:
+    """
+    Сохранение загруженного изображения в хранилище в разделе section.
+    Файл читается частями по IMAGE_UPLOAD_CHUNK_SIZE, запись и хэширование идут вне event loop
+    во временный файл, который затем передается хранилищу под ключом по SHA-256 содержимого.
+    Одинаковые изображения хранятся один раз. Возвращает ключ.
+    Ключ блокируется в транзакции db: запись, ссылающуюся на него, нужно зафиксировать в той же транзакции.
+    """
+    file_extension = get_extension(file.filename)
+    if file.size is not None and file.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise _too_large()
+
+    storage = get_image_storage()
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=storage.temp_dir(), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while chunk := await file.read(settings.IMAGE_UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.IMAGE_UPLOAD_MAX_BYTES:
+                    raise _too_large()
+                await asyncio.to_thread(_write_chunk, tmp, hasher, chunk)
+            await asyncio.to_thread(os.fsync, tmp.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    key = content_key(section, hasher.hexdigest(), file_extension)
+    try:
+        await lock_image_key(db, key)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    await storage.put(key, tmp_path)
+    return key
+
+
+# Удаление изображения и его вариантов, если на него больше не ссылается ни одна запись model.
+# Проверка ссылок и удаление выполняются под блокировкой ключа, транзакция db фиксируется
+async def remove_if_unreferenced(db: AsyncSession, model, image_path: Optional[str]) -> None:
+    if not image_path:
+        return
+
+    key = key_from_image_path(image_path)
+    try:
+        await lock_image_key(db, key)
+        result = await db.execute(select(func.count()).select_from(model).where(model.image_path == image_path))
+        if result.scalar() == 0:
+            await get_image_storage().delete([key, *variant_keys(key)])
+    finally:
+        await db.commit()
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Dict, List
+import asyncio
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+from .core.config import settings
+from .storage import get_image_storage
+
+# Размеры вариантов изображения: максимальная сторона в пикселях
+VARIANT_SIZES = {"thumb": 320, "medium": 800, "large": 1600}
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+VARIANTS_DIR = "variants"
+
+MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".svg": "image/svg+xml",
+    ".webp": "image/webp",
+}
+
+# Пул потоков для декодирования и масштабирования изображений вне event loop
+variant_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants"
+)
+
+# Варианты, которые сейчас строятся: повторные запросы ждут ту же задачу
+_pending: Dict[str, asyncio.Task] = {}
+
+
+def has_variants(key: str) -> bool:
+    return PurePosixPath(key).suffix.lower() in RASTER_EXTENSIONS
+
+
+# Ключ варианта рядом с оригиналом: <каталог>/variants/<имя оригинала>_<размер>.<формат>
+def variant_key(key: str, size: str, webp: bool) -> str:
+    original = PurePosixPath(key)
+    if webp:
+        extension = ".webp"
+    elif original.suffix.lower() in (".jpg", ".jpeg"):
+        extension = ".jpg"
+    else:
+        extension = ".png"
+    return str(original.parent / VARIANTS_DIR / f"{original.stem}_{size}{extension}")
+
+
+def variant_keys(key: str) -> List[str]:
+    return [variant_key(key, size, webp) for size in VARIANT_SIZES for webp in (False, True)]
+
+
+def _render_variant(original: Path, tmp_dir: Path, size: str, webp: bool, jpeg: bool) -> str:
+    max_side = VARIANT_SIZES[size]
+    with Image.open(original) as image:
+        # Для JPEG декодер сразу уменьшает изображение кратно 1/2..1/8, не распаковывая полный размер
+        image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+        os.close(fd)
+        try:
+            if webp:
+                image.save(tmp_path, "WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+            elif jpeg:
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                image.save(tmp_path, "JPEG", quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                image.save(tmp_path, "PNG", optimize=True)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return tmp_path
+
+
+async def _build_variant(key: str, size: str, webp: bool) -> Path:
+    storage = get_image_storage()
+    target_key = variant_key(key, size, webp)
+    path = await storage.local_path(target_key)
+    if path is not None:
+        return path
+
+    original = await storage.local_path(key)
+    if original is None:
+        raise FileNotFoundError(key)
+
+    loop = asyncio.get_running_loop()
+    tmp_path = await loop.run_in_executor(
+        variant_executor, _render_variant, original, storage.temp_dir(), size, webp, target_key.endswith(".jpg")
+    )
+    await storage.put(target_key, tmp_path)
+    return await storage.local_path(target_key)
+
+
+def _forget(key: str, task: asyncio.Task) -> None:
+    _pending.pop(key, None)
+    if not task.cancelled():
+        task.exception()
+
+
+def _submit(key: str, size: str, webp: bool) -> asyncio.Task:
+    target_key = variant_key(key, size, webp)
+    task = _pending.get(target_key)
+    if task is None:
+        task = asyncio.create_task(_build_variant(key, size, webp))
+        _pending[target_key] = task
+        task.add_done_callback(lambda t: _forget(target_key, t))
+    return task
+
+
+async def get_variant(key: str, size: str, webp: bool) -> Path:
+    """Локальный путь к варианту изображения; отсутствующий вариант строится в пуле потоков и сохраняется в хранилище"""
+    path = await get_image_storage().local_path(variant_key(key, size, webp))
+    if path is not None:
+        return path
+    return await asyncio.shield(_submit(key, size, webp))
+
+
+def schedule_variants(key: str) -> None:
+    """Фоновое построение всех размеров в исходном формате и в WebP после загрузки"""
+    if not has_variants(key):
+        return
+    for size in VARIANT_SIZES:
+        for webp in (False, True):
+            _submit(key, size, webp)
@@ -1,11 +1,95 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from typing import List, Optional, Type, TypeVar, Generic, Any, Dict
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy import select, insert, update, delete, func, text, tuple_, null
+from pydantic import BaseModel
+from typing import List, Optional, Type, TypeVar, Generic, Any, Dict, Tuple
+import base64
+import datetime
+import hashlib
+import json
 
-from .models import Base
+from .models import Base, Vehicle, PriceList, Category, Factory, Chassis, WheelFormula, Engine
+from .core.cache import TTLCache
+from .core.config import settings
 
 T = TypeVar('T', bound=Base)
 
+# Кодирование значений ключа последней записи страницы в непрозрачный курсор
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime.datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+# Декодирование курсора в значения ключевых колонок (ValueError при некорректном курсоре)
+def decode_cursor(cursor: str, key_columns) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(key_columns):
+        raise ValueError("Invalid cursor")
+
+    return [_cursor_value(column, value) for column, value in zip(key_columns, values)]
+
+# Проверка значения курсора по типу колонки, чтобы в запрос не попадали значения другого типа
+def _cursor_value(column, value: Any) -> Any:
+    if value is None:
+        if column.nullable:
+            return None
+        raise ValueError("Invalid cursor")
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+
+    if python_type is datetime.datetime:
+        if isinstance(value, str):
+            try:
+                return datetime.datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    elif python_type is int:
+        # bool - подкласс int, но в курсоре ему не место
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif python_type is str:
+        if isinstance(value, str):
+            return value
+    elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return value
+    raise ValueError("Invalid cursor")
+
+# Выборка страницы по ключу (keyset): WHERE (ключ) > (курсор) ORDER BY ключ LIMIT n
+async def fetch_keyset_page(db: AsyncSession, stmt, key_columns, cursor: Optional[str], limit: int, descending: bool = False):
+    if cursor:
+        key = tuple_(*key_columns)
+        values = tuple_(*decode_cursor(cursor, key_columns))
+        stmt = stmt.where(key < values if descending else key > values)
+
+    stmt = stmt.order_by(*[c.desc() if descending else c.asc() for c in key_columns]).limit(limit)
+    result = await db.execute(stmt)
+    items = result.scalars().all()
+
+    next_cursor = None
+    if items and len(items) == limit:
+        next_cursor = encode_cursor([getattr(items[-1], c.key) for c in key_columns])
+    return items, next_cursor
+
+# Столбцы таблицы model под поля схемы ответа; необязательные поля без столбца (связи) отдаются как null
+def schema_columns(model, schema: Type[BaseModel]) -> List[Any]:
+    table_columns = model.__table__.columns
+    columns = []
+    for name, field in schema.model_fields.items():
+        if name in table_columns:
+            columns.append(table_columns[name])
+        elif not field.is_required():
+            columns.append(null().label(name))
+        else:
+            raise ValueError(f"Field {name} of {schema.__name__} has no column in {model.__tablename__}")
+    return columns
+
 class BaseRepository(Generic[T]):
     def __init__(self, model: Type[T]):
         self.model = model
@@ -15,6 +99,49 @@ class BaseRepository(Generic[T]):
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
 
+    # Получение записей словарями со столбцами схемы ответа, без создания ORM-объектов и повторной валидации.
+    # conditions - произвольные условия на столбцы, order_by - выражения сортировки (по умолчанию первичный ключ,
+    # чтобы страницы skip/limit были стабильными), limit=None - без ограничения
+    async def get_rows(
+        self,
+        db: AsyncSession,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        conditions: Tuple = (),
+        order_by: Tuple = ()
+    ) -> List[Dict[str, Any]]:
+        result = await db.execute(
+            select(*schema_columns(self.model, schema))
+            .where(*conditions)
+            .order_by(*(order_by or self.model.__mapper__.primary_key))
+            .offset(skip)
+            .limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    # Получение страницы записей по курсору, сортировка по колонке order_by и первичному ключу
+    async def get_page(
+        self,
+        db: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        conditions: Tuple = ()
+    ) -> Tuple[List[T], Optional[str]]:
+        pk_columns = [c for c in self.model.__table__.columns if c.primary_key]
+        if not pk_columns:
+            raise ValueError(f"No primary key found for model {self.model.__name__}")
+
+        key_columns = [pk_columns[0]]
+        if order_by and order_by != pk_columns[0].name:
+            key_columns.insert(0, self.model.__table__.columns[order_by])
+
+        return await fetch_keyset_page(
+            db, select(self.model).where(*conditions), key_columns, cursor, limit, descending
+        )
+
     # Получение записи по идентификатору
     async def get_by_id(self, db: AsyncSession, id_value: int) -> Optional[T]:
         pk_columns = [c for c in self.model.__table__.columns if c.primary_key]
@@ -33,6 +160,48 @@ class BaseRepository(Generic[T]):
         await db.refresh(db_obj)
         return db_obj
 
+    # Создание нескольких записей пакетным INSERT ... RETURNING в одной транзакции
+    async def create_many(self, db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> List[T]:
+        if not rows:
+            return []
+
+        result = await db.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            rows
+        )
+        created = result.all()
+        if commit:
+            await db.commit()
+        return created
+
+    # Пакетное обновление по первичному ключу; возвращает обновленные записи по ключу (отсутствующие пропускаются)
+    async def update_many(self, db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> Dict[Any, T]:
+        pk_columns = [c.name for c in self.model.__table__.columns if c.primary_key]
+        if not pk_columns:
+            raise ValueError(f"No primary key found for model {self.model.__name__}")
+
+        id_field = getattr(self.model, pk_columns[0])
+        ids = [row[pk_columns[0]] for row in rows]
+        result = await db.execute(select(id_field).where(id_field.in_(ids)))
+        existing_ids = set(result.scalars().all())
+
+        update_rows = [
+            {k: v for k, v in row.items() if v is not None}
+            for row in rows if row[pk_columns[0]] in existing_ids
+        ]
+        update_rows = [row for row in update_rows if len(row) > 1]
+        if update_rows:
+            await db.execute(update(self.model), update_rows)
+        if commit:
+            await db.commit()
+
+        result = await db.execute(
+            select(self.model)
+            .where(id_field.in_(existing_ids))
+            .execution_options(populate_existing=True)
+        )
+        return {getattr(obj, pk_columns[0]): obj for obj in result.scalars().all()}
+
     # Обновление существующей записи
     async def update(self, db: AsyncSession, id_value: int, obj_data: Dict[str, Any]) -> Optional[T]:
         pk_columns = [c.name for c in self.model.__table__.columns if c.primary_key]
@@ -89,6 +258,332 @@ class BaseRepository(Generic[T]):
         return result.scalar()
 
 
+# Репозиторий справочника с кэшем всей таблицы в памяти процесса.
+# Изменения сбрасывают кэш только своего воркера: остальные воркеры отдают прежние данные и ETag
+# не дольше REFERENCE_CACHE_TTL_SECONDS
+class ReferenceRepository(BaseRepository[T]):
+    def __init__(self, model: Type[T]):
+        super().__init__(model)
+        self._cache = TTLCache(settings.REFERENCE_CACHE_TTL_SECONDS, 1)
+        self._pk_name = [c.name for c in model.__table__.columns if c.primary_key][0]
+
+    # Загрузка таблицы в кэш при промахе: строки, индекс по ключу и ETag содержимого
+    async def _load(self, db: AsyncSession) -> Dict[str, Any]:
+        entry = self._cache.get("table")
+        if entry is not None:
+            return entry
+
+        table = self.model.__table__
+        result = await db.execute(select(table).order_by(table.c[self._pk_name]))
+        rows = [dict(row._mapping) for row in result.all()]
+        digest = hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+        entry = {
+            "rows": rows,
+            "by_id": {row[self._pk_name]: row for row in rows},
+            "etag": f'"{table.name}-{digest[:16]}"',
+        }
+        self._cache.set("table", entry)
+        return entry
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    async def get_etag(self, db: AsyncSession) -> str:
+        return (await self._load(db))["etag"]
+
+    async def get_rows(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        return (await self._load(db))["rows"]
+
+    async def get_all(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        return (await self.get_rows(db))[skip:skip + limit]
+
+    async def get_by_id(self, db: AsyncSession, id_value: int) -> Optional[Dict[str, Any]]:
+        return (await self._load(db))["by_id"].get(id_value)
+
+    async def create(self, db: AsyncSession, obj_data: Dict[str, Any]) -> T:
+        try:
+            return await super().create(db, obj_data)
+        finally:
+            self.invalidate()
+
+    # Кэш сбрасывается сразу после записи, до чтения обновленной строки, чтобы она не бралась из старого кэша
+    async def update(self, db: AsyncSession, id_value: int, obj_data: Dict[str, Any]):
+        update_data = {k: v for k, v in obj_data.items() if v is not None}
+        if update_data:
+            try:
+                await db.execute(
+                    update(self.model)
+                    .where(self.model.__table__.c[self._pk_name] == id_value)
+                    .values(**update_data)
+                )
+                await db.commit()
+            finally:
+                self.invalidate()
+        return await self.get_by_id(db, id_value)
+
+    async def delete(self, db: AsyncSession, id_value: int) -> bool:
+        try:
+            return await super().delete(db, id_value)
+        finally:
+            self.invalidate()
+
+
+# Репозиторий прайс-листа: каждая запись поддерживает текущую цену ТС
+# (vehicles.current_price_id, current_price, current_delivery_time) в той же транзакции
+class PriceListRepository(BaseRepository[PriceList]):
+    def __init__(self):
+        super().__init__(PriceList)
+
+    # Пересчет текущей цены (последней по price_id) для указанных ТС одним UPDATE
+    async def refresh_current_prices(self, db: AsyncSession, vehicle_ids) -> None:
+        vehicle_ids = {vehicle_id for vehicle_id in vehicle_ids if vehicle_id is not None}
+        if not vehicle_ids:
+            return
+
+        vehicles = Vehicle.__table__
+        latest = (
+            select(PriceList.price_id)
+            .where(PriceList.vehicle_id == vehicles.c.vehicle_id)
+            .order_by(PriceList.price_id.desc())
+            .limit(1)
+            .correlate(vehicles)
+            .scalar_subquery()
+        )
+        current = aliased(PriceList)
+        await db.execute(
+            update(vehicles)
+            .where(vehicles.c.vehicle_id.in_(vehicle_ids))
+            .values(
+                current_price_id=latest,
+                current_price=select(current.price).where(current.price_id == latest).scalar_subquery(),
+                current_delivery_time=select(current.delivery_time).where(current.price_id == latest).scalar_subquery(),
+            )
+        )
+
+    async def _vehicle_ids_for(self, db: AsyncSession, price_ids) -> List[int]:
+        result = await db.execute(select(PriceList.vehicle_id).where(PriceList.price_id.in_(price_ids)))
+        return result.scalars().all()
+
+    async def create(self, db: AsyncSession, obj_data: Dict[str, Any]) -> PriceList:
+        db_obj = self.model(**obj_data)
+        db.add(db_obj)
+        await db.flush()
+        await self.refresh_current_prices(db, [db_obj.vehicle_id])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def create_many(self, db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> List[PriceList]:
+        created = await super().create_many(db, rows, commit=False)
+        await self.refresh_current_prices(db, [price.vehicle_id for price in created])
+        if commit:
+            await db.commit()
+        return created
+
+    async def update_many(self, db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> Dict[Any, PriceList]:
+        # При переносе цены на другое ТС пересчитываются и старое, и новое
+        vehicle_ids = set(await self._vehicle_ids_for(db, [row["price_id"] for row in rows]))
+        updated = await super().update_many(db, rows, commit=False)
+        vehicle_ids.update(price.vehicle_id for price in updated.values())
+        await self.refresh_current_prices(db, vehicle_ids)
+        if commit:
+            await db.commit()
+        return updated
+
+    async def update(self, db: AsyncSession, id_value: int, obj_data: Dict[str, Any]) -> Optional[PriceList]:
+        updated = await self.update_many(db, [{**obj_data, "price_id": id_value}])
+        return updated.get(id_value)
+
+    async def delete(self, db: AsyncSession, id_value: int) -> bool:
+        result = await db.execute(
+            delete(self.model)
+            .where(self.model.price_id == id_value)
+            .returning(self.model.vehicle_id)
+        )
+        vehicle_id = result.scalar()
+        if vehicle_id is None:
+            return False
+
+        await self.refresh_current_prices(db, [vehicle_id])
+        await db.commit()
+        return True
+
+
+# Репозиторий транспортных средств с поиском по фильтрам и подсчетом фасетов
+class VehicleRepository(BaseRepository[Vehicle]):
+    FACET_COLUMNS = ("category_id", "factory_id", "chassis_id", "wheel_formula_id", "engine_id")
+    REFERENCE_MODELS = {
+        "category_id": Category,
+        "factory_id": Factory,
+        "chassis_id": Chassis,
+        "wheel_formula_id": WheelFormula,
+        "engine_id": Engine,
+    }
+
+    # Связи, которые можно раскрыть параметром expand
+    EXPAND_RELATIONSHIPS = {
+        "category": Vehicle.category,
+        "factory": Vehicle.factory,
+        "chassis": Vehicle.chassis,
+        "wheel_formula": Vehicle.wheel_formula,
+        "engine": Vehicle.engine,
+    }
+
+    def __init__(self):
+        super().__init__(Vehicle)
+
+    # Разбор параметра expand ("category,engine" или "all"); ValueError при неизвестной связи
+    def parse_expand(self, expand: Optional[str]) -> List[str]:
+        if not expand:
+            return []
+        names = [name.strip() for name in expand.split(",") if name.strip()]
+        if "all" in names:
+            return list(self.EXPAND_RELATIONSHIPS)
+        unknown = [name for name in names if name not in self.EXPAND_RELATIONSHIPS]
+        if unknown:
+            raise ValueError(f"Unknown expand values: {', '.join(unknown)}")
+        return names
+
+    # ТС со всеми справочниками одним запросом (LEFT JOIN на каждый справочник)
+    async def get_full(self, db: AsyncSession, vehicle_id: int) -> Optional[Vehicle]:
+        result = await db.execute(
+            select(self.model)
+            .options(*[joinedload(relationship) for relationship in self.EXPAND_RELATIONSHIPS.values()])
+            .where(self.model.vehicle_id == vehicle_id)
+        )
+        return result.scalars().first()
+
+    # Догрузка указанных связей для уже выбранной страницы ТС одним запросом, порядок сохраняется
+    async def expand(self, db: AsyncSession, vehicles: List[Vehicle], relations: List[str]) -> List[Vehicle]:
+        if not relations or not vehicles:
+            return vehicles
+
+        result = await db.execute(
+            select(self.model)
+            .options(*[joinedload(self.EXPAND_RELATIONSHIPS[name]) for name in relations])
+            .where(self.model.vehicle_id.in_([vehicle.vehicle_id for vehicle in vehicles]))
+        )
+        by_id = {vehicle.vehicle_id: vehicle for vehicle in result.scalars().all()}
+        return [by_id[vehicle.vehicle_id] for vehicle in vehicles if vehicle.vehicle_id in by_id]
+
+    # Список ТС по условиям с раскрытыми связями relations одним запросом, в порядке первичного ключа
+    async def get_expanded(
+        self,
+        db: AsyncSession,
+        relations: List[str],
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        conditions: Tuple = ()
+    ) -> List[Vehicle]:
+        result = await db.execute(
+            select(self.model)
+            .options(*[joinedload(self.EXPAND_RELATIONSHIPS[name]) for name in relations])
+            .where(*conditions)
+            .order_by(self.model.vehicle_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    # Проверка ссылок на справочники для набора строк: по одному запросу на справочник,
+    # для каждой строки возвращается описание ошибки или None
+    async def find_invalid_references(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Optional[str]]:
+        existing: Dict[str, set] = {}
+        for column_name, model in self.REFERENCE_MODELS.items():
+            ids = {row[column_name] for row in rows if row.get(column_name) is not None}
+            if not ids:
+                continue
+            pk = getattr(model, column_name)
+            result = await db.execute(select(pk).where(pk.in_(ids)))
+            existing[column_name] = set(result.scalars().all())
+
+        errors = []
+        for row in rows:
+            invalid = [
+                f"{column_name}={row[column_name]}"
+                for column_name in self.REFERENCE_MODELS
+                if row.get(column_name) is not None and row[column_name] not in existing[column_name]
+            ]
+            errors.append(f"Unknown references: {', '.join(invalid)}" if invalid else None)
+        return errors
+
+    # Построение условий фильтрации по справочникам, году, цвету и текущей цене
+    def _search_conditions(self, filters: Dict[str, Any]):
+        conditions = []
+        for column_name in self.FACET_COLUMNS:
+            values = filters.get(column_name)
+            if values:
+                conditions.append(getattr(self.model, column_name).in_(values))
+
+        if filters.get("year_from") is not None:
+            conditions.append(self.model.year >= filters["year_from"])
+        if filters.get("year_to") is not None:
+            conditions.append(self.model.year <= filters["year_to"])
+        if filters.get("color"):
+            conditions.append(func.lower(self.model.color) == filters["color"].lower())
+        if filters.get("price_from") is not None:
+            conditions.append(self.model.current_price >= filters["price_from"])
+        if filters.get("price_to") is not None:
+            conditions.append(self.model.current_price <= filters["price_to"])
+        return conditions
+
+    # Порядок выдачи поиска; ТС без цены при сортировке по цене идут последними
+    SORT_ORDERS = {
+        "id": (Vehicle.vehicle_id.asc(),),
+        "price_asc": (Vehicle.current_price.asc().nulls_last(), Vehicle.vehicle_id.asc()),
+        "price_desc": (Vehicle.current_price.desc().nulls_last(), Vehicle.vehicle_id.asc()),
+        "newest": (Vehicle.publication_date.desc(), Vehicle.vehicle_id.desc()),
+    }
+
+    # Поиск транспортных средств: страница результатов, общее количество и фасеты
+    async def search(
+        self,
+        db: AsyncSession,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        sort: str = "id"
+    ) -> Dict[str, Any]:
+        conditions = self._search_conditions(filters)
+
+        result = await db.execute(
+            select(self.model)
+            .where(*conditions)
+            .order_by(*self.SORT_ORDERS[sort])
+            .offset(skip)
+            .limit(limit)
+        )
+        items = result.scalars().all()
+
+        # Все фасеты и общее количество считаются за один проход через GROUPING SETS
+        facet_columns = [getattr(self.model, name) for name in self.FACET_COLUMNS]
+        result = await db.execute(
+            select(
+                *facet_columns,
+                *[func.grouping(column).label(f"{column.name}_grouping") for column in facet_columns],
+                func.count().label("count"),
+            )
+            .select_from(self.model)
+            .where(*conditions)
+            .group_by(func.grouping_sets(*facet_columns, text("()")))
+        )
+
+        total = 0
+        facets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self.FACET_COLUMNS}
+        for row in result.all():
+            grouped_by = [name for name in self.FACET_COLUMNS if row._mapping[f"{name}_grouping"] == 0]
+            if not grouped_by:
+                total = row.count
+                continue
+            name = grouped_by[0]
+            facets[name].append({"value": row._mapping[name], "count": row.count})
+
+        for values in facets.values():
+            values.sort(key=lambda facet: facet["count"], reverse=True)
+
+        return {"items": items, "total": total, "facets": facets}
+
+
 # Специальный класс для TovaryVZayavke (с составным первичным ключом)
 class TovaryVZayavkeRepository:
     def __init__(self, model):
@@ -99,6 +594,11 @@ class TovaryVZayavkeRepository:
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
     
+    # Получение страницы записей по курсору (ключ - пара request_id, vehicle_id)
+    async def get_page(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100):
+        key_columns = [self.model.__table__.c.request_id, self.model.__table__.c.vehicle_id]
+        return await fetch_keyset_page(db, select(self.model), key_columns, cursor, limit)
+
     # Получение всех товаров для конкретной заявки
     async def get_by_request_id(self, db: AsyncSession, request_id: int):
         result = await db.execute(
@@ -107,6 +607,22 @@ class TovaryVZayavkeRepository:
         )
         return result.scalars().all()
     
+    # Получение товаров заявки вместе с данными ТС и текущей ценой одним запросом
+    async def get_details_by_request_id(self, db: AsyncSession, request_id: int):
+        result = await db.execute(
+            select(
+                self.model.request_id,
+                self.model.vehicle_id,
+                self.model.quantity,
+                Vehicle.title,
+                Vehicle.description,
+                func.coalesce(Vehicle.current_price, 0).label("price"),
+            )
+            .outerjoin(Vehicle, Vehicle.vehicle_id == self.model.vehicle_id)
+            .where(self.model.request_id == request_id)
+        )
+        return [dict(row._mapping) for row in result.all()]
+
     # Получение записи по составному ключу
     async def get_by_ids(self, db: AsyncSession, request_id: int, vehicle_id: int):
         result = await db.execute(
@@ -126,6 +642,13 @@ class TovaryVZayavkeRepository:
         await db.refresh(db_obj)
         return db_obj
     
+    # Создание нескольких записей одним многострочным INSERT
+    async def create_many(self, db: AsyncSession, rows: List[Dict[str, Any]], commit: bool = True) -> None:
+        if rows:
+            await db.execute(insert(self.model.__table__).values(rows))
+        if commit:
+            await db.commit()
+
     # Обновление существующей записи по составному ключу
     async def update(self, db: AsyncSession, request_id: int, vehicle_id: int, obj_data: Dict[str, Any]):
         update_data = {k: v for k, v in obj_data.items() if v is not None}
@@ -13,6 +13,8 @@ from .news_router import router as news_router
 from .tovary_router import router as tovary_router
 from .auth_router import router as auth_router
 from .image_router import router as image_router
+from .catalog_router import router as catalog_router
+from .export_router import router as export_router
 
 
 main_router = APIRouter()
@@ -29,4 +31,6 @@ main_router.include_router(price_list_router)
 main_router.include_router(request_router)
 main_router.include_router(news_router)
 main_router.include_router(tovary_router)
-main_router.include_router(image_router)
\ No newline at end of file
+main_router.include_router(image_router)
+main_router.include_router(catalog_router)
+main_router.include_router(export_router)
\ No newline at end of file
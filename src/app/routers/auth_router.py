@@ -8,7 +8,8 @@ from jose import jwt, JWTError
 from ..models import User
 from ..schemas import Token, LoginCredentials, PasswordChange
 from ..core.auth_utils import (
-    authenticate_user, create_token, revoke_token, 
+    authenticate_user, create_token, revoke_token, invalidate_user_cache,
+    hash_password, verify_password,
     ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, ALGORITHM
 )
 from ..core.config import settings
@@ -180,6 +181,8 @@ async def logout(
         except JWTError:
             pass
     
+    await invalidate_user_cache(db, current_user.user_id)
+    
     response.delete_cookie(key="access_token")
     response.delete_cookie(key="refresh_token")
     
@@ -193,7 +196,7 @@ async def change_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Изменение пароля пользователя"""
-    if not current_user.verify_password(password_data.current_password):
+    if not await verify_password(current_user, password_data.current_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
@@ -205,10 +208,11 @@ async def change_password(
             detail="Passwords do not match"
         )
     
-    current_user.password = password_data.new_password
+    current_user.password_hash = await hash_password(password_data.new_password)
     
     db.add(current_user)
     await db.commit()
+    await invalidate_user_cache(db, current_user.user_id)
     
     return {"detail": "Password changed successfully"}
 
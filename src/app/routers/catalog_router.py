@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+
+from ..schemas import CatalogBootstrap
+from ..core.dependencies import get_db
+from ..core.http_cache import conditional_response, REFERENCE_CACHE_CONTROL
+from .category_router import category_repository
+from .chassis_router import chassis_repository
+from .engine_router import engine_repository
+from .factory_router import factory_repository
+from .wheel_formula_router import wheel_formula_repository
+from .vehicle_router import vehicle_repository
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+reference_repositories = {
+    "categories": category_repository,
+    "chassis": chassis_repository,
+    "engines": engine_repository,
+    "factories": factory_repository,
+    "wheel_formulas": wheel_formula_repository,
+}
+
+# Все справочники каталога (и при необходимости первая страница техники) одним ответом
+@router.get("/bootstrap", response_model=CatalogBootstrap)
+async def get_catalog_bootstrap(
+    request: Request,
+    response: Response,
+    include_vehicles: bool = False,
+    vehicles_limit: int = 20,
+    db: AsyncSession = Depends(get_db)
+):
+    etags = [await repository.get_etag(db) for repository in reference_repositories.values()]
+    version = hashlib.sha1("".join(etags).encode()).hexdigest()[:16]
+
+    # Версия описывает только справочники, поэтому ответ с техникой не кэшируется
+    if include_vehicles:
+        response.headers["Cache-Control"] = "no-cache"
+    else:
+        not_modified = conditional_response(request, response, f'"catalog-{version}"', REFERENCE_CACHE_CONTROL)
+        if not_modified:
+            return not_modified
+
+    bootstrap = {"version": version}
+    for name, repository in reference_repositories.items():
+        bootstrap[name] = await repository.get_rows(db)
+
+    if include_vehicles:
+        bootstrap["vehicles"] = await vehicle_repository.get_all(db, 0, vehicles_limit)
+
+    return bootstrap
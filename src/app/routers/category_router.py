@@ -1,26 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import Category
 from ..schemas import CategoryCreate, CategoryRead, CategoryUpdate
-from ..repository import BaseRepository
+from ..repository import ReferenceRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.http_cache import conditional_response, REFERENCE_CACHE_CONTROL
 
 router = APIRouter(prefix="/categories", tags=["categories"])
-category_repository = BaseRepository(Category)
+category_repository = ReferenceRepository(Category)
 
 # Получение всех категорий
 @router.get("/", response_model=List[CategoryRead])
-async def get_categories(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await category_repository.get_all(db, skip, limit)
+async def get_categories(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    not_modified = conditional_response(request, response, await category_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return await paginate(category_repository, db, response, skip, limit, cursor)
 
 # Получение категории по ID
 @router.get("/{category_id}", response_model=CategoryRead)
-async def get_category(category_id: int, db: AsyncSession = Depends(get_db)):
+async def get_category(
+    category_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     category = await category_repository.get_by_id(db, category_id)
     if category is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+    
+    not_modified = conditional_response(request, response, await category_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
     return category
 
 # Создание новой категории
@@ -1,26 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import Chassis
 from ..schemas import ChassisCreate, ChassisRead, ChassisUpdate
-from ..repository import BaseRepository
+from ..repository import ReferenceRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.http_cache import conditional_response, REFERENCE_CACHE_CONTROL
 
 router = APIRouter(prefix="/chassis", tags=["chassis"])
-chassis_repository = BaseRepository(Chassis)
+chassis_repository = ReferenceRepository(Chassis)
 
 # Получение всех шасси
 @router.get("/", response_model=List[ChassisRead])
-async def get_chassis_list(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await chassis_repository.get_all(db, skip, limit)
+async def get_chassis_list(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    not_modified = conditional_response(request, response, await chassis_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return await paginate(chassis_repository, db, response, skip, limit, cursor)
 
 # Получение шасси по ID
 @router.get("/{chassis_id}", response_model=ChassisRead)
-async def get_chassis(chassis_id: int, db: AsyncSession = Depends(get_db)):
+async def get_chassis(
+    chassis_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     chassis = await chassis_repository.get_by_id(db, chassis_id)
     if chassis is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chassis not found")
+    
+    not_modified = conditional_response(request, response, await chassis_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
     return chassis
 
 # Создание нового шасси
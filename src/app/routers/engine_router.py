@@ -1,26 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import Engine
 from ..schemas import EngineCreate, EngineRead, EngineUpdate
-from ..repository import BaseRepository
+from ..repository import ReferenceRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.http_cache import conditional_response, REFERENCE_CACHE_CONTROL
 
 router = APIRouter(prefix="/engines", tags=["engines"])
-engine_repository = BaseRepository(Engine)
+engine_repository = ReferenceRepository(Engine)
 
 # Получение всех двигателей
 @router.get("/", response_model=List[EngineRead])
-async def get_engines(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await engine_repository.get_all(db, skip, limit)
+async def get_engines(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    not_modified = conditional_response(request, response, await engine_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return await paginate(engine_repository, db, response, skip, limit, cursor)
 
 # Получение двигателя по ID
 @router.get("/{engine_id}", response_model=EngineRead)
-async def get_engine(engine_id: int, db: AsyncSession = Depends(get_db)):
+async def get_engine(
+    engine_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     engine = await engine_repository.get_by_id(db, engine_id)
     if engine is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Engine not found")
+    
+    not_modified = conditional_response(request, response, await engine_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
     return engine
 
 # Создание нового двигателя
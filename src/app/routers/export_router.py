@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from datetime import datetime
+from enum import Enum
+import csv
+import io
+import json
+
+from ..models import Vehicle, Requests, PriceList, User
+from ..core.database import SessionLocal
+from ..core.dependencies import get_current_admin_user
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_PARTITION_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def _stream_table(table, file_format: str):
+    """
+    Построчная выгрузка таблицы через серверный курсор.
+    Сессия открывается внутри генератора: он выполняется уже после выхода из обработчика.
+    """
+    columns = [column.name for column in table.columns]
+    async with SessionLocal() as db:
+        result = await db.stream(
+            select(table)
+            .order_by(*table.primary_key.columns)
+            .execution_options(yield_per=EXPORT_PARTITION_SIZE)
+        )
+
+        if file_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+
+        async for partition in result.partitions():
+            if file_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([[_export_value(value) for value in row] for row in partition])
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(
+                        {name: _export_value(value) for name, value in zip(columns, row)},
+                        ensure_ascii=False
+                    ) + "\n"
+                    for row in partition
+                )
+
+
+def _export_response(table, file_format: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_table(table, file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{file_format}"'}
+    )
+
+# Выгрузка транспортных средств
+@router.get("/vehicles")
+async def export_vehicles(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    return _export_response(Vehicle.__table__, format, "vehicles")
+
+# Выгрузка заявок
+@router.get("/requests")
+async def export_requests(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    return _export_response(Requests.__table__, format, "requests")
+
+# Выгрузка прайс-листа
+@router.get("/price-list")
+async def export_price_list(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    return _export_response(PriceList.__table__, format, "price_list")
@@ -1,26 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import Factory
 from ..schemas import FactoryCreate, FactoryRead, FactoryUpdate
-from ..repository import BaseRepository
+from ..repository import ReferenceRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.http_cache import conditional_response, REFERENCE_CACHE_CONTROL
 
 router = APIRouter(prefix="/factories", tags=["factories"])
-factory_repository = BaseRepository(Factory)
+factory_repository = ReferenceRepository(Factory)
 
 # Получение всех заводов
 @router.get("/", response_model=List[FactoryRead])
-async def get_factories(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await factory_repository.get_all(db, skip, limit)
+async def get_factories(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    not_modified = conditional_response(request, response, await factory_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return await paginate(factory_repository, db, response, skip, limit, cursor)
 
 # Получение завода по ID
 @router.get("/{factory_id}", response_model=FactoryRead)
-async def get_factory(factory_id: int, db: AsyncSession = Depends(get_db)):
+async def get_factory(
+    factory_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     factory = await factory_repository.get_by_id(db, factory_id)
     if factory is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Factory not found")
+    
+    not_modified = conditional_response(request, response, await factory_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
     return factory
 
 # Создание нового завода
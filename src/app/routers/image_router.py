@@ -1,26 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Response
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Response, Request, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-import os
-import shutil
-from typing import Optional
+from typing import Literal, Optional
 from pathlib import Path
+import asyncio
 
 from ..models import Vehicle, News, User
 from ..core.dependencies import get_db, get_current_active_user
 from ..repository import BaseRepository
+from ..image_upload import save_upload, remove_if_unreferenced
+from ..image_variants import MEDIA_TYPES, VARIANT_SIZES, has_variants, get_variant, schedule_variants
+from ..core.cache import TTLCache
+from ..core.config import settings, BASE_DIR
+from ..core.http_cache import IMAGE_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, etag_matches
+from ..storage import get_image_storage, image_path_for, key_from_image_path
+from email.utils import formatdate
 
-VEHICLE_IMAGES_DIR = Path("src/static/images/products")
-VEHICLE_IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+# Разделы хранилища изображений
+VEHICLE_IMAGES_SECTION = "products"
+NEWS_IMAGES_SECTION = "news"
 
-NEWS_IMAGES_DIR = Path("src/static/images/news")
-NEWS_IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+# Заглушки из клиента (каталог client рядом с src), не зависят от рабочего каталога процесса
+PLACEHOLDERS_DIR = Path(BASE_DIR).parent / "client" / "public" / "images" / "placeholders"
+VEHICLE_PLACEHOLDER = PLACEHOLDERS_DIR / "vehicle.svg"
+NEWS_PLACEHOLDER = PLACEHOLDERS_DIR / "news.svg"
+
+# image_path записей по ("vehicles" | "news", id): запросы без изменения изображения не ходят в БД.
+# Сбрасывается при загрузке и удалении изображения в этом воркере; если другой воркер удалил или заменил
+# файл, отсутствие файла обнаруживается при обращении и запись перечитывается из БД
+image_metadata_cache = TTLCache(settings.IMAGE_METADATA_TTL_SECONDS, settings.IMAGE_METADATA_MAX_SIZE)
+_NOT_CACHED = object()
 
 router = APIRouter(prefix="/images", tags=["images"])
 vehicle_repository = BaseRepository(Vehicle)
 news_repository = BaseRepository(News)
 
+ImageSize = Optional[Literal["thumb", "medium", "large"]]
+SIZE_DESCRIPTION = "Вариант изображения: " + ", ".join(
+    f"{name} (до {side}px)" for name, side in VARIANT_SIZES.items()
+) + "; без параметра - оригинал"
+
+async def _load_image_path(db: AsyncSession, kind: str, model, id_value: int) -> Optional[str]:
+    id_field = [c for c in model.__table__.columns if c.primary_key][0]
+    result = await db.execute(select(model.image_path).where(id_field == id_value))
+    image_path = result.scalar()
+    image_metadata_cache.set((kind, id_value), image_path)
+    return image_path
+
+# Ключ и локальный путь файла изображения с результатом stat или None, если файла нет
+async def _resolve_image(image_path: Optional[str]):
+    if not image_path:
+        return None
+    try:
+        image_key = key_from_image_path(image_path)
+        file_path = await get_image_storage().local_path(image_key)
+    except ValueError:
+        return None
+    if file_path is None:
+        return None
+    try:
+        stat = await asyncio.to_thread(file_path.stat)
+    except FileNotFoundError:
+        return None
+    return image_key, file_path, stat
+
+# Метаданные изображения записи: ключ и локальный путь (или заглушка), версия и Last-Modified.
+# Имена загруженных файлов не переиспользуются, поэтому имя файла служит версией.
+# Кэшируется только image_path записи, наличие файла проверяется на каждый запрос
+async def get_image_metadata(db: AsyncSession, kind: str, model, id_value: int, placeholder: Path) -> dict:
+    image_path = image_metadata_cache.get((kind, id_value), _NOT_CACHED)
+    cached = image_path is not _NOT_CACHED
+    if not cached:
+        image_path = await _load_image_path(db, kind, model, id_value)
+    
+    resolved = await _resolve_image(image_path)
+    if resolved is None and cached and image_path:
+        # Файл удален или изображение заменено в другом воркере - перечитываем запись
+        image_metadata_cache.delete((kind, id_value))
+        image_path = await _load_image_path(db, kind, model, id_value)
+        resolved = await _resolve_image(image_path)
+    
+    if resolved is not None:
+        image_key, file_path, stat = resolved
+        return {
+            "key": image_key,
+            "file_path": file_path,
+            "version": file_path.name,
+            "etag_base": file_path.name,
+            "last_modified": formatdate(stat.st_mtime, usegmt=True),
+        }
+    
+    try:
+        stat = await asyncio.to_thread(placeholder.stat)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Изображение не найдено")
+    return {
+        "key": None,
+        "file_path": placeholder,
+        "version": None,
+        "etag_base": f"{placeholder.stem}-{int(stat.st_mtime):x}-{stat.st_size:x}",
+        "last_modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+
+# Ответ с оригиналом или вариантом нужного размера (WebP, если клиент его принимает).
+# ETag строится из имени файла, поэтому 304 отдается без чтения файла и построения варианта
+async def image_response(request: Request, metadata: dict, size: Optional[str], version: Optional[str]):
+    file_path = metadata["file_path"]
+    variant = size is not None and metadata["key"] is not None and has_variants(metadata["key"])
+    webp = variant and "image/webp" in request.headers.get("accept", "")
+    
+    etag = metadata["etag_base"]
+    if variant:
+        etag += f"-{size}" + ("-webp" if webp else "")
+    
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": metadata["last_modified"],
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if version and version == metadata["version"] else IMAGE_CACHE_CONTROL,
+    }
+    if variant:
+        headers["Vary"] = "Accept"
+    
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    path = file_path
+    if variant:
+        try:
+            path = await get_variant(metadata["key"], size, webp)
+        except Exception:
+            # Файл не удалось декодировать - отдаем оригинал
+            path = file_path
+    return FileResponse(str(path), media_type=MEDIA_TYPES.get(path.suffix.lower()), headers=headers)
+
 # Загрузка изображения для транспортного средства
 @router.post("/vehicles/{vehicle_id}")
 async def upload_vehicle_image(
@@ -45,60 +158,33 @@ async def upload_vehicle_image(
             detail="Недостаточно прав для загрузки изображения"
         )
     
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    if file_extension not in ['.jpg', '.jpeg', '.png', '.svg']:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Неподдерживаемый формат файла. Разрешены только .jpg, .jpeg, .png и .svg"
-        )
-    
-    filename = f"vehicle_{vehicle_id}{file_extension}"
-    file_path = VEHICLE_IMAGES_DIR / filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    image_path = f"/static/images/products/{filename}"
+    key = await save_upload(db, file, VEHICLE_IMAGES_SECTION)
+    schedule_variants(key)
+    image_path = image_path_for(key)
     
+    old_image_path = vehicle.image_path
     vehicle.image_path = image_path
     await db.commit()
+    image_metadata_cache.delete(("vehicles", vehicle_id))
     
-    return {"filename": filename, "image_path": image_path}
+    if old_image_path != image_path:
+        await remove_if_unreferenced(db, Vehicle, old_image_path)
+    
+    return {"filename": Path(key).name, "image_path": image_path}
 
 # Получение изображения транспортного средства
 @router.get("/vehicles/{vehicle_id}")
 async def get_vehicle_image(
     vehicle_id: int,
+    request: Request,
+    size: ImageSize = Query(None, description=SIZE_DESCRIPTION),
+    v: Optional[str] = Query(None, description="Версия изображения (имя файла) для неизменяемого кэширования"),
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(Vehicle).where(Vehicle.vehicle_id == vehicle_id)
-    result = await db.execute(stmt)
-    vehicle = result.scalars().first()
-    
-    if not vehicle or not vehicle.image_path:
-        return FileResponse(
-            "client/public/images/placeholders/vehicle.svg",
-            media_type="image/svg+xml"
-        )
-    
-    filename = os.path.basename(vehicle.image_path)
-    file_path = VEHICLE_IMAGES_DIR / filename
-    
-    if not file_path.exists():
-        return FileResponse(
-            "client/public/images/placeholders/vehicle.svg",
-            media_type="image/svg+xml"
-        )
-    
-    media_type = None
-    if filename.endswith('.jpg') or filename.endswith('.jpeg'):
-        media_type = "image/jpeg"
-    elif filename.endswith('.png'):
-        media_type = "image/png"
-    elif filename.endswith('.svg'):
-        media_type = "image/svg+xml"
-    
-    return FileResponse(str(file_path), media_type=media_type)
+    metadata = await get_image_metadata(
+        db, "vehicles", Vehicle, vehicle_id, VEHICLE_PLACEHOLDER
+    )
+    return await image_response(request, metadata, size, v)
 
 # Удаление изображения транспортного средства
 @router.delete("/vehicles/{vehicle_id}")
@@ -129,14 +215,13 @@ async def delete_vehicle_image(
             detail="Изображение не найдено"
         )
     
-    filename = os.path.basename(vehicle.image_path)
-    file_path = VEHICLE_IMAGES_DIR / filename
-    
-    if file_path.exists():
-        os.remove(file_path)
-    
+    old_image_path = vehicle.image_path
     vehicle.image_path = None
     await db.commit()
+    image_metadata_cache.delete(("vehicles", vehicle_id))
+    
+    # Файл может использоваться другими ТС с таким же изображением
+    await remove_if_unreferenced(db, Vehicle, old_image_path)
     
     return {"detail": "Изображение успешно удалено"}
 
@@ -164,61 +249,34 @@ async def upload_news_image(
             detail="Недостаточно прав для загрузки изображения"
         )
     
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    if file_extension not in ['.jpg', '.jpeg', '.png', '.svg']:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Неподдерживаемый формат файла. Разрешены только .jpg, .jpeg, .png и .svg"
-        )
-    
-    filename = f"news_{news_id}{file_extension}"
-    file_path = NEWS_IMAGES_DIR / filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    image_path = f"/static/images/news/{filename}"
+    key = await save_upload(db, file, NEWS_IMAGES_SECTION)
+    schedule_variants(key)
+    image_path = image_path_for(key)
     
+    old_image_path = news.image_path
     news.image_url = None
     news.image_path = image_path
     await db.commit()
+    image_metadata_cache.delete(("news", news_id))
+    
+    if old_image_path != image_path:
+        await remove_if_unreferenced(db, News, old_image_path)
     
-    return {"filename": filename, "image_path": image_path}
+    return {"filename": Path(key).name, "image_path": image_path}
 
 # Получение изображения новости
 @router.get("/news/{news_id}")
 async def get_news_image(
     news_id: int,
+    request: Request,
+    size: ImageSize = Query(None, description=SIZE_DESCRIPTION),
+    v: Optional[str] = Query(None, description="Версия изображения (имя файла) для неизменяемого кэширования"),
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(News).where(News.news_id == news_id)
-    result = await db.execute(stmt)
-    news = result.scalars().first()
-    
-    if not news or not news.image_path:
-        return FileResponse(
-            "client/public/images/placeholders/news.svg",
-            media_type="image/svg+xml"
-        )
-    
-    filename = os.path.basename(news.image_path)
-    file_path = NEWS_IMAGES_DIR / filename
-    
-    if not file_path.exists():
-        return FileResponse(
-            "client/public/images/placeholders/news.svg",
-            media_type="image/svg+xml"
-        )
-    
-    media_type = None
-    if filename.endswith('.jpg') or filename.endswith('.jpeg'):
-        media_type = "image/jpeg"
-    elif filename.endswith('.png'):
-        media_type = "image/png"
-    elif filename.endswith('.svg'):
-        media_type = "image/svg+xml"
-    
-    return FileResponse(str(file_path), media_type=media_type)
+    metadata = await get_image_metadata(
+        db, "news", News, news_id, NEWS_PLACEHOLDER
+    )
+    return await image_response(request, metadata, size, v)
 
 # Удаление изображения новости
 @router.delete("/news/{news_id}")
@@ -249,13 +307,12 @@ async def delete_news_image(
             detail="Изображение не найдено"
         )
     
-    filename = os.path.basename(news.image_path)
-    file_path = NEWS_IMAGES_DIR / filename
-    
-    if file_path.exists():
-        os.remove(file_path)
-    
+    old_image_path = news.image_path
     news.image_path = None
     await db.commit()
+    image_metadata_cache.delete(("news", news_id))
+    
+    # Файл может использоваться другими новостями с таким же изображением
+    await remove_if_unreferenced(db, News, old_image_path)
     
     return {"detail": "Изображение успешно удалено"}
\ No newline at end of file
@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import News
 from ..schemas import NewsCreate, NewsRead, NewsUpdate
 from ..repository import BaseRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.responses import FastJSONResponse
+from .image_router import image_metadata_cache
 
 router = APIRouter(prefix="/news", tags=["news"])
 news_repository = BaseRepository(News)
 
 # Получение всех новостей
 @router.get("/", response_model=List[NewsRead])
-async def get_news(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await news_repository.get_all(db, skip, limit)
+async def get_news(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    return await paginate(news_repository, db, response, skip, limit, cursor, order_by="publication_date", descending=True)
 
 # Получение новости по ID
 @router.get("/{news_id}", response_model=NewsRead)
@@ -37,7 +46,9 @@ async def update_news(news_id: int, news_data: NewsUpdate, db: AsyncSession = De
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News item not found")
     
     news_dict = news_data.model_dump(exclude_unset=True)
-    return await news_repository.update(db, news_id, news_dict)
+    updated_news = await news_repository.update(db, news_id, news_dict)
+    image_metadata_cache.delete(("news", news_id))
+    return updated_news
 
 # Удаление новости
 @router.delete("/{news_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -45,14 +56,12 @@ async def delete_news(news_id: int, db: AsyncSession = Depends(get_db)):
     success = await news_repository.delete(db, news_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News item not found")
+    image_metadata_cache.delete(("news", news_id))
     return None
 
 # Получение новостей по ID пользователя
 @router.get("/user/{user_id}", response_model=List[NewsRead])
 async def get_news_by_user(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(News.__table__.select().where(News.user_id == user_id))
-    news_items = result.fetchall()
-    if not news_items:
-        return []
-    
-    return [News(**dict(news._mapping)) for news in news_items] 
\ No newline at end of file
+    return FastJSONResponse(
+        await news_repository.get_rows(db, NewsRead, limit=None, conditions=(News.user_id == user_id,))
+    ) 
\ No newline at end of file
@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import PriceList
-from ..schemas import PriceListCreate, PriceListRead, PriceListUpdate
-from ..repository import BaseRepository
+from ..schemas import PriceListCreate, PriceListRead, PriceListUpdate, PriceListBatchUpdate, BatchItemResult
+from ..repository import PriceListRepository
+from ..core.config import settings
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/price-list", tags=["price-list"])
-price_list_repository = BaseRepository(PriceList)
+price_list_repository = PriceListRepository()
 
 # Получение всех прайс-листов
 @router.get("/", response_model=List[PriceListRead])
-async def get_price_list(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await price_list_repository.get_all(db, skip, limit)
+async def get_price_list(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    return await paginate(price_list_repository, db, response, skip, limit, cursor)
 
 # Получение прайс-листа по ID
 @router.get("/{price_id}", response_model=PriceListRead)
@@ -29,6 +38,35 @@ async def create_price(price_data: PriceListCreate, db: AsyncSession = Depends(g
     price_dict = price_data.model_dump()
     return await price_list_repository.create(db, price_dict)
 
+# Пакетное обновление прайс-листов в одной транзакции
+@router.put("/batch", response_model=List[BatchItemResult])
+async def update_prices_batch(prices_data: List[PriceListBatchUpdate], db: AsyncSession = Depends(get_db)):
+    if len(prices_data) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds {settings.MAX_BATCH_SIZE} rows"
+        )
+    
+    rows = []
+    for price_data in prices_data:
+        price_dict = price_data.model_dump(exclude_unset=True)
+        if price_dict.get("delivery_time") is not None:
+            price_dict["delivery_time"] = price_dict["delivery_time"].replace(tzinfo=None)
+        rows.append(price_dict)
+    
+    try:
+        updated = await price_list_repository.update_many(db, rows)
+    except Exception as e:
+        await db.rollback()
+        raise e
+    
+    return [
+        BatchItemResult(index=index, status="updated", id=row["price_id"])
+        if row["price_id"] in updated else
+        BatchItemResult(index=index, status="error", id=row["price_id"], detail="Price not found")
+        for index, row in enumerate(rows)
+    ]
+
 # Обновление прайс-листа
 @router.put("/{price_id}", response_model=PriceListRead)
 async def update_price(price_id: int, price_data: PriceListUpdate, db: AsyncSession = Depends(get_db)):
@@ -51,20 +89,16 @@ async def delete_price(price_id: int, db: AsyncSession = Depends(get_db)):
 @router.get("/vehicle/{vehicle_id}", response_model=List[PriceListRead])
 async def get_prices_by_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_db)):
     """Get all prices for a specific vehicle"""
-    result = await db.execute(PriceList.__table__.select().where(PriceList.vehicle_id == vehicle_id))
-    prices = result.fetchall()
-    if not prices:
-        return []
-    
-    return [PriceList(**dict(price._mapping)) for price in prices]
+    return FastJSONResponse(
+        await price_list_repository.get_rows(
+            db, PriceListRead, limit=None, conditions=(PriceList.vehicle_id == vehicle_id,)
+        )
+    )
 
 # Получение прайс-листов по ID пользователя
 @router.get("/user/{user_id}", response_model=List[PriceListRead])
 async def get_prices_by_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all prices created by a specific user"""
-    result = await db.execute(PriceList.__table__.select().where(PriceList.user_id == user_id))
-    prices = result.fetchall()
-    if not prices:
-        return []
-    
-    return [PriceList(**dict(price._mapping)) for price in prices] 
\ No newline at end of file
+    return FastJSONResponse(
+        await price_list_repository.get_rows(db, PriceListRead, limit=None, conditions=(PriceList.user_id == user_id,))
+    )
\ No newline at end of file
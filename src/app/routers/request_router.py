@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from sqlalchemy.future import select
@@ -6,16 +6,25 @@ from sqlalchemy.orm import selectinload
 
 from ..models import Requests, TovaryVZayavke, User, Vehicle, PriceList
 from ..schemas import RequestCreate, RequestRead, RequestUpdate, TovaryVZayavkeCreate, TovaryVZayavkeRead
-from ..repository import BaseRepository
+from ..repository import BaseRepository, TovaryVZayavkeRepository
 from ..core.dependencies import get_db, get_current_active_user
+from ..core.pagination import paginate
+from ..core.responses import FastJSONResponse
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 request_repository = BaseRepository(Requests)
+tovary_repository = TovaryVZayavkeRepository(TovaryVZayavke)
 
 # Получение всех заявок
 @router.get("/", response_model=List[RequestRead])
-async def get_requests(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await request_repository.get_all(db, skip, limit)
+async def get_requests(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    return await paginate(request_repository, db, response, skip, limit, cursor, rows_schema=RequestRead)
 
 # Получение заявки по ID
 @router.get("/{request_id}", response_model=RequestRead)
@@ -52,22 +61,16 @@ async def delete_request(request_id: int, db: AsyncSession = Depends(get_db)):
 # Получение заявок по ID пользователя
 @router.get("/user/{user_id}", response_model=List[RequestRead])
 async def get_requests_by_user(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(Requests.__table__.select().where(Requests.user_id == user_id))
-    requests = result.fetchall()
-    if not requests:
-        return []
-    
-    return [Requests(**dict(request._mapping)) for request in requests]
+    return FastJSONResponse(
+        await request_repository.get_rows(db, RequestRead, limit=None, conditions=(Requests.user_id == user_id,))
+    )
 
 # Получение заявок по статусу
 @router.get("/status/{status}", response_model=List[RequestRead])
 async def get_requests_by_status(status: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(Requests.__table__.select().where(Requests.status == status))
-    requests = result.fetchall()
-    if not requests:
-        return []
-    
-    return [Requests(**dict(request._mapping)) for request in requests]
+    return FastJSONResponse(
+        await request_repository.get_rows(db, RequestRead, limit=None, conditions=(Requests.status == status,))
+    )
 
 # Создание заказа (заявка + товары)
 class OrderItem(TovaryVZayavkeCreate):
@@ -83,22 +86,38 @@ async def create_order(
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_active_user)
 ):
+    # Одинаковые позиции объединяются, иначе нарушится составной первичный ключ
+    quantities: Dict[int, int] = {}
+    for item in order_data.tovary_v_zayavke:
+        quantities[item.vehicle_id] = quantities.get(item.vehicle_id, 0) + item.quantity
+    
+    if quantities:
+        result = await db.execute(select(Vehicle.vehicle_id).where(Vehicle.vehicle_id.in_(quantities)))
+        missing_ids = set(quantities) - set(result.scalars().all())
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Vehicles not found: {sorted(missing_ids)}"
+            )
+    
     try:
         request_dict = order_data.model_dump(exclude={'tovary_v_zayavke'})
         if current_user:
             request_dict["user_id"] = current_user.user_id
         
-        request = await request_repository.create(db, request_dict)
+        # Заявка и все ее товары записываются в одной транзакции
+        request = Requests(**request_dict)
+        db.add(request)
+        await db.flush()
         
-        for item in order_data.tovary_v_zayavke:
-            tovary_dict = {
-                "request_id": request.request_id,
-                "vehicle_id": item.vehicle_id,
-                "quantity": item.quantity
-            }
-            
-            stmt = TovaryVZayavke.__table__.insert().values(**tovary_dict)
-            await db.execute(stmt)
+        await tovary_repository.create_many(
+            db,
+            [
+                {"request_id": request.request_id, "vehicle_id": vehicle_id, "quantity": quantity}
+                for vehicle_id, quantity in quantities.items()
+            ],
+            commit=False
+        )
         
         await db.commit()
         
@@ -113,12 +132,11 @@ async def get_my_requests(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    result = await db.execute(Requests.__table__.select().where(Requests.user_id == current_user.user_id))
-    requests = result.fetchall()
-    if not requests:
-        return []
-    
-    return [Requests(**dict(request._mapping)) for request in requests]
+    return FastJSONResponse(
+        await request_repository.get_rows(
+            db, RequestRead, limit=None, conditions=(Requests.user_id == current_user.user_id,)
+        )
+    )
 
 # Схема для товара в заказе с дополнительной информацией
 class OrderItemDetail(TovaryVZayavkeRead):
@@ -147,38 +165,7 @@ async def get_order_details(
             detail="You don't have permission to view this order"
         )
     
-    result = await db.execute(
-        select(TovaryVZayavke)
-        .where(TovaryVZayavke.request_id == request_id)
-    )
-    order_items = result.scalars().all()
-    
-    items_with_details = []
-    for item in order_items:
-        vehicle_result = await db.execute(
-            select(Vehicle)
-            .where(Vehicle.vehicle_id == item.vehicle_id)
-        )
-        vehicle = vehicle_result.scalars().first()
-        
-        price_result = await db.execute(
-            select(PriceList)
-            .where(PriceList.vehicle_id == item.vehicle_id)
-            .order_by(PriceList.price_id.desc())  # Берем последнюю цену
-            .limit(1)
-        )
-        price_item = price_result.scalars().first()
-        price = price_item.price if price_item else 0
-        
-        item_dict = {
-            "request_id": item.request_id,
-            "vehicle_id": item.vehicle_id,
-            "quantity": item.quantity,
-            "title": vehicle.title if vehicle else None,
-            "description": vehicle.description if vehicle else None,
-            "price": price
-        }
-        items_with_details.append(item_dict)
+    items_with_details = await tovary_repository.get_details_by_request_id(db, request_id)
     
     request_dict = {
         "request_id": request.request_id,
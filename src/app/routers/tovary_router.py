@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import TovaryVZayavke
 from ..schemas import TovaryVZayavkeCreate, TovaryVZayavkeRead, TovaryVZayavkeUpdate
 from ..repository import TovaryVZayavkeRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
 
 router = APIRouter(prefix="/requisitioned-goods", tags=["requisitioned-goods"])
 tovary_repository = TovaryVZayavkeRepository(TovaryVZayavke)
 
 # Получение всех товаров в заявках
 @router.get("/", response_model=List[TovaryVZayavkeRead])
-async def get_all_requisitioned_goods(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await tovary_repository.get_all(db, skip, limit)
+async def get_all_requisitioned_goods(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    return await paginate(tovary_repository, db, response, skip, limit, cursor, rows_schema=TovaryVZayavkeRead)
 
 # Получение товаров по ID заявки
 @router.get("/request/{request_id}", response_model=List[TovaryVZayavkeRead])
@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from typing import List, Optional
 
 from ..models import User
 from ..schemas import UserCreate, UserRead, UserUpdate
 from ..repository import BaseRepository
 from ..core.dependencies import get_db
+from ..core.auth_utils import invalidate_user_cache, hash_password
+from ..core.pagination import paginate
 
 router = APIRouter(prefix="/users", tags=["users"])
 user_repository = BaseRepository(User)
 
 # Получение всех пользователей
 @router.get("/", response_model=List[UserRead])
-async def get_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await user_repository.get_all(db, skip, limit)
+async def get_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    return await paginate(user_repository, db, response, skip, limit, cursor)
 
 # Получение пользователя по ID
 @router.get("/{user_id}", response_model=UserRead)
@@ -28,10 +36,8 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     user_dict = user_data.model_dump()
-    user = User(**user_dict)
-    user.password = user_dict.get("password")
-    user_dict = {k: v for k, v in user_dict.items() if k != "password"}
-    user_dict["password_hash"] = user.password_hash
+    password = user_dict.pop("password")
+    user_dict["password_hash"] = await hash_password(password)
     
     try:
         return await user_repository.create(db, user_dict)
@@ -52,13 +58,13 @@ async def update_user(user_id: int, user_data: UserUpdate, db: AsyncSession = De
     user_dict = user_data.model_dump(exclude_unset=True)
     
     if "password" in user_dict and user_dict["password"]:
-        temp_user = User()
-        temp_user.password = user_dict["password"]
-        user_dict["password_hash"] = temp_user.password_hash
+        user_dict["password_hash"] = await hash_password(user_dict["password"])
         del user_dict["password"]
     
     try:
-        return await user_repository.update(db, user_id, user_dict)
+        updated_user = await user_repository.update(db, user_id, user_dict)
+        await invalidate_user_cache(db, user_id)
+        return updated_user
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -72,4 +78,5 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     success = await user_repository.delete(db, user_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await invalidate_user_cache(db, user_id)
     return None 
\ No newline at end of file
@@ -1,39 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import select
+import asyncio
+import os
+import tempfile
 
-from ..models import Vehicle, User, PriceList
-from ..schemas import VehicleCreate, VehicleRead, VehicleUpdate
-from ..repository import BaseRepository
+from ..models import Vehicle, User
+from ..schemas import (
+    VehicleCreate, VehicleRead, VehicleFull, VehicleUpdate, VehicleSearchResult, VehicleBatchCreate, BatchItemResult,
+    VehicleImportJob
+)
+from ..repository import VehicleRepository, PriceListRepository
 from ..core.dependencies import get_db, get_current_active_user, get_current_admin_user
+from ..core.pagination import paginate
+from ..core.responses import FastJSONResponse
+from ..core.config import settings
+from ..vehicle_import import start_import, load_import_job
+from .image_router import image_metadata_cache
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
-vehicle_repository = BaseRepository(Vehicle)
-price_list_repository = BaseRepository(PriceList)
+vehicle_repository = VehicleRepository()
+price_list_repository = PriceListRepository()
+
+EXPAND_DESCRIPTION = "Раскрываемые связи через запятую: category, factory, chassis, wheel_formula, engine или all"
+
+# Разбор параметра expand с ответом 400 на неизвестные связи
+def parse_expand(expand: Optional[str]) -> List[str]:
+    try:
+        return vehicle_repository.parse_expand(expand)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 # Получение всех транспортных средств
-@router.get("/", response_model=List[VehicleRead])
+@router.get("/", response_model=List[VehicleFull])
 async def get_vehicles(
+    response: Response,
     category_id: Optional[int] = None,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
     db: AsyncSession = Depends(get_db)
 ):
-    if category_id is not None:
-        result = await db.execute(
-            Vehicle.__table__.select()
-            .where(Vehicle.category_id == category_id)
-            .offset(skip)
-            .limit(limit)
-        )
-        vehicles = result.fetchall()
-        if not vehicles:
-            return []
-        return [Vehicle(**dict(vehicle._mapping)) for vehicle in vehicles]
-    else:
-        return await vehicle_repository.get_all(db, skip, limit)
+    relations = parse_expand(expand)
+    conditions = (Vehicle.category_id == category_id,) if category_id is not None else ()
+    if cursor is None:
+        return await list_vehicles(db, relations, conditions, skip, limit)
+    vehicles = await paginate(vehicle_repository, db, response, skip, limit, cursor, conditions=conditions)
+    return await vehicle_repository.expand(db, vehicles, relations)
+
+# Список ТС по условиям: без раскрытия связей строки выбираются без ORM-объектов и сразу кодируются в JSON,
+# иначе ТС загружаются вместе со связями одним запросом
+async def list_vehicles(
+    db: AsyncSession,
+    relations: List[str],
+    conditions: Tuple = (),
+    skip: int = 0,
+    limit: Optional[int] = None
+):
+    if not relations:
+        return FastJSONResponse(await vehicle_repository.get_rows(db, VehicleFull, skip, limit, conditions))
+    return await vehicle_repository.get_expanded(db, relations, skip, limit, conditions)
+
+# Поиск транспортных средств с фильтрами и подсчетом фасетов
+@router.get("/search", response_model=VehicleSearchResult)
+async def search_vehicles(
+    category_id: Optional[List[int]] = Query(None),
+    factory_id: Optional[List[int]] = Query(None),
+    chassis_id: Optional[List[int]] = Query(None),
+    wheel_formula_id: Optional[List[int]] = Query(None),
+    engine_id: Optional[List[int]] = Query(None),
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    color: Optional[str] = None,
+    price_from: Optional[int] = Query(None, description="Минимальная цена"),
+    price_to: Optional[int] = Query(None, description="Максимальная цена"),
+    sort: Literal["id", "price_asc", "price_desc", "newest"] = "id",
+    skip: int = 0,
+    limit: int = 100,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: AsyncSession = Depends(get_db)
+):
+    relations = parse_expand(expand)
+    filters = {
+        "category_id": category_id,
+        "factory_id": factory_id,
+        "chassis_id": chassis_id,
+        "wheel_formula_id": wheel_formula_id,
+        "engine_id": engine_id,
+        "year_from": year_from,
+        "year_to": year_to,
+        "color": color,
+        "price_from": price_from,
+        "price_to": price_to,
+    }
+    result = await vehicle_repository.search(db, filters, skip, limit, sort)
+    result["items"] = await vehicle_repository.expand(db, result["items"], relations)
+    return result
+
+# Получение транспортного средства со всеми справочниками и текущей ценой одним запросом
+@router.get("/{vehicle_id}/full", response_model=VehicleFull)
+async def get_vehicle_full(vehicle_id: int, db: AsyncSession = Depends(get_db)):
+    vehicle = await vehicle_repository.get_full(db, vehicle_id)
+    if vehicle is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
+    return vehicle
 
 # Получение транспортного средства по ID
 @router.get("/{vehicle_id}", response_model=VehicleRead)
@@ -69,9 +141,107 @@ async def create_vehicle(
             "user_id": current_user.user_id
         }
         await price_list_repository.create(db, price_data)
+        await db.refresh(vehicle)
     
     return vehicle
 
+# Пакетное создание транспортных средств с ценами в одной транзакции
+@router.post("/batch", response_model=List[BatchItemResult], status_code=status.HTTP_201_CREATED)
+async def create_vehicles_batch(
+    vehicles_data: List[VehicleBatchCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if len(vehicles_data) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds {settings.MAX_BATCH_SIZE} rows"
+        )
+    
+    rows = [vehicle_data.model_dump() for vehicle_data in vehicles_data]
+    errors = await vehicle_repository.find_invalid_references(db, rows)
+    valid_indexes = [index for index, error in enumerate(errors) if error is None]
+    
+    publication_date = datetime.now()
+    vehicle_rows = []
+    for index in valid_indexes:
+        vehicle_dict = {k: v for k, v in rows[index].items() if k not in ("price", "delivery_time")}
+        vehicle_dict["user_id"] = current_user.user_id
+        vehicle_dict["publication_date"] = publication_date
+        vehicle_rows.append(vehicle_dict)
+    
+    try:
+        vehicles = await vehicle_repository.create_many(db, vehicle_rows, commit=False)
+        
+        price_rows = []
+        for index, vehicle in zip(valid_indexes, vehicles):
+            price, delivery_time = rows[index]["price"], rows[index]["delivery_time"]
+            if price is not None and delivery_time is not None:
+                price_rows.append({
+                    "price": price,
+                    "delivery_time": delivery_time.replace(tzinfo=None),
+                    "vehicle_id": vehicle.vehicle_id,
+                    "user_id": current_user.user_id
+                })
+        await price_list_repository.create_many(db, price_rows, commit=False)
+        
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+    
+    created_ids = {index: vehicle.vehicle_id for index, vehicle in zip(valid_indexes, vehicles)}
+    return [
+        BatchItemResult(index=index, status="created", id=created_ids[index])
+        if error is None else
+        BatchItemResult(index=index, status="error", detail=error)
+        for index, error in enumerate(errors)
+    ]
+
+# Импорт техники из CSV или NDJSON (тело запроса - сам файл).
+# Файл (не больше IMPORT_MAX_BYTES) потоково сохраняется во временный файл и обрабатывается в фоне пачками
+@router.post("/import", response_model=VehicleImportJob, status_code=status.HTTP_202_ACCEPTED)
+async def import_vehicles(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Формат файла: csv или ndjson"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Размер файла превышает {settings.IMPORT_MAX_BYTES} байт"
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.IMPORT_MAX_BYTES:
+        raise too_large
+    
+    tmp = tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False)
+    try:
+        with tmp:
+            size = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.IMPORT_MAX_BYTES:
+                    raise too_large
+                await asyncio.to_thread(tmp.write, chunk)
+        return await start_import(db, tmp.name, format, current_user.user_id, current_user.is_admin)
+    except BaseException:
+        # Обрыв загрузки или ошибка регистрации задачи: фоновый импорт не запущен, файл больше не нужен
+        os.remove(tmp.name)
+        raise
+
+# Состояние задачи импорта
+@router.get("/import/{job_id}", response_model=VehicleImportJob)
+async def get_import_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    job = await load_import_job(db, job_id)
+    if job is None or (job["user_id"] != current_user.user_id and not current_user.is_admin):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return job
+
 # Обновление транспортного средства (только для владельца или админа)
 @router.put("/{vehicle_id}", response_model=VehicleRead)
 async def update_vehicle(
@@ -94,22 +264,18 @@ async def update_vehicle(
     
     vehicle_dict = vehicle_data.model_dump(exclude_unset=True)
     updated_vehicle = await vehicle_repository.update(db, vehicle_id, vehicle_dict)
+    image_metadata_cache.delete(("vehicles", vehicle_id))
     
     if price is not None and delivery_time is not None:
         if delivery_time.tzinfo is not None:
             delivery_time = delivery_time.replace(tzinfo=None)
             
-        result = await db.execute(
-            select(PriceList).where(PriceList.vehicle_id == vehicle_id)
-        )
-        existing_price = result.scalars().first()
-        
-        if existing_price:
+        if updated_vehicle.current_price_id is not None:
             price_data = {
                 "price": price,
                 "delivery_time": delivery_time
             }
-            await price_list_repository.update(db, existing_price.price_id, price_data)
+            await price_list_repository.update(db, updated_vehicle.current_price_id, price_data)
         else:
             price_data = {
                 "price": price,
@@ -118,6 +284,7 @@ async def update_vehicle(
                 "user_id": current_user.user_id
             }
             await price_list_repository.create(db, price_data)
+        await db.refresh(updated_vehicle)
     
     return updated_vehicle
 
@@ -141,30 +308,28 @@ async def delete_vehicle(
     success = await vehicle_repository.delete(db, vehicle_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
+    image_metadata_cache.delete(("vehicles", vehicle_id))
     return None
 
 # Получение транспортных средств по ID пользователя
-@router.get("/user/{user_id}", response_model=List[VehicleRead])
-async def get_vehicles_by_user(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(Vehicle.__table__.select().where(Vehicle.user_id == user_id))
-    vehicles = result.fetchall()
-    if not vehicles:
-        return []
-    
-    return [Vehicle(**dict(vehicle._mapping)) for vehicle in vehicles]
+@router.get("/user/{user_id}", response_model=List[VehicleFull])
+async def get_vehicles_by_user(
+    user_id: int,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    db: AsyncSession = Depends(get_db)
+):
+    relations = parse_expand(expand)
+    return await list_vehicles(db, relations, (Vehicle.user_id == user_id,))
 
 # Получение транспортных средств текущего пользователя
-@router.get("/my/", response_model=List[VehicleRead])
+@router.get("/my/", response_model=List[VehicleFull])
 async def get_my_vehicles(
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    result = await db.execute(Vehicle.__table__.select().where(Vehicle.user_id == current_user.user_id))
-    vehicles = result.fetchall()
-    if not vehicles:
-        return []
-    
-    return [Vehicle(**dict(vehicle._mapping)) for vehicle in vehicles]
+    relations = parse_expand(expand)
+    return await list_vehicles(db, relations, (Vehicle.user_id == current_user.user_id,))
 
 # Обновление даты публикации для одного транспортного средства (только для админа)
 @router.put("/{vehicle_id}/update-publication-date", response_model=VehicleRead)
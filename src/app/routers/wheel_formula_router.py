@@ -1,26 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from ..models import WheelFormula
 from ..schemas import WheelFormulaCreate, WheelFormulaRead, WheelFormulaUpdate
-from ..repository import BaseRepository
+from ..repository import ReferenceRepository
 from ..core.dependencies import get_db
+from ..core.pagination import paginate
+from ..core.http_cache import conditional_response, REFERENCE_CACHE_CONTROL
 
 router = APIRouter(prefix="/wheel-formulas", tags=["wheel-formulas"])
-wheel_formula_repository = BaseRepository(WheelFormula)
+wheel_formula_repository = ReferenceRepository(WheelFormula)
 
 # Получение всех колесных формул
 @router.get("/", response_model=List[WheelFormulaRead])
-async def get_wheel_formulas(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await wheel_formula_repository.get_all(db, skip, limit)
+async def get_wheel_formulas(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    not_modified = conditional_response(request, response, await wheel_formula_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return await paginate(wheel_formula_repository, db, response, skip, limit, cursor)
 
 # Получение колесной формулы по ID
 @router.get("/{wheel_formula_id}", response_model=WheelFormulaRead)
-async def get_wheel_formula(wheel_formula_id: int, db: AsyncSession = Depends(get_db)):
+async def get_wheel_formula(
+    wheel_formula_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     wheel_formula = await wheel_formula_repository.get_by_id(db, wheel_formula_id)
     if wheel_formula is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Wheel formula not found")
+    
+    not_modified = conditional_response(request, response, await wheel_formula_repository.get_etag(db), REFERENCE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
     return wheel_formula
 
 # Создание новой колесной формулы
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, model_validator
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -136,8 +136,29 @@ class VehicleRead(VehicleBase):
     vehicle_id: int
     user_id: int
     publication_date: datetime
+    current_price: Optional[int] = None
+    current_delivery_time: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
 
+# ТС со связанными справочниками; незагруженные связи отдаются как null без ленивой загрузки
+class VehicleFull(VehicleRead):
+    category: Optional[CategoryRead] = None
+    factory: Optional[FactoryRead] = None
+    chassis: Optional[ChassisRead] = None
+    wheel_formula: Optional[WheelFormulaRead] = None
+    engine: Optional[EngineRead] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def loaded_attributes_only(cls, data):
+        if isinstance(data, (dict, BaseModel)):
+            return data
+        return {name: data.__dict__[name] for name in cls.model_fields if name in data.__dict__}
+
+class VehicleBatchCreate(VehicleBase):
+    price: Optional[int] = None
+    delivery_time: Optional[datetime] = None
+
 class VehicleUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -151,6 +172,41 @@ class VehicleUpdate(BaseModel):
     engine_id: Optional[int] = None
     publication_date: Optional[datetime] = None
 
+# Схемы поиска транспортных средств
+class FacetCount(BaseModel):
+    value: Optional[int] = None
+    count: int
+
+class VehicleSearchResult(BaseModel):
+    items: List[VehicleFull]
+    total: int
+    facets: Dict[str, List[FacetCount]]
+
+# Схема начальных данных каталога
+class CatalogBootstrap(BaseModel):
+    version: str
+    categories: List[CategoryRead]
+    chassis: List[ChassisRead]
+    engines: List[EngineRead]
+    factories: List[FactoryRead]
+    wheel_formulas: List[WheelFormulaRead]
+    vehicles: Optional[List[VehicleRead]] = None
+
+# Схемы импорта техники
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+class VehicleImportJob(BaseModel):
+    job_id: str
+    status: str
+    processed: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError] = []
+    detail: Optional[str] = None
+
 # Схемы прайс-листа
 class PriceListBase(BaseModel):
     price: int
@@ -169,6 +225,16 @@ class PriceListUpdate(BaseModel):
     price: Optional[int] = None
     delivery_time: Optional[datetime] = None
 
+class PriceListBatchUpdate(PriceListUpdate):
+    price_id: int
+
+# Результат обработки одной строки пакетного запроса
+class BatchItemResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
 # Схемы заявки
 class PaymentMethodEnum(str, Enum):
     BANK_CARD = "банковская карта"
@@ -0,0 +1,232 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Optional
+import asyncio
+import mimetypes
+import os
+import tempfile
+
+from .core.config import settings
+
+# Адреса изображений в БД имеют вид /static/images/<ключ>; ключ - путь объекта в хранилище
+IMAGE_PATH_PREFIX = "/static/images/"
+
+
+def image_path_for(key: str) -> str:
+    return IMAGE_PATH_PREFIX + key
+
+
+def key_from_image_path(image_path: str) -> str:
+    return image_path.removeprefix(IMAGE_PATH_PREFIX).lstrip("/")
+
+
+# Ключ файла по хэшу содержимого: <раздел>/ab/cd/abcd...<расширение>
+def content_key(section: str, digest: str, extension: str) -> str:
+    return f"{section}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def _check_key(key: str) -> str:
+    if not key or key.startswith("/") or ".." in Path(key).parts:
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return key
+
+
+class ImageStorage(ABC):
+    """
+    Хранилище изображений по ключам.
+    Объекты неизменяемы: ключ однозначно определяет содержимое, поэтому запись существующего ключа
+    ничего не меняет, а локальные копии никогда не устаревают.
+    """
+
+    # Каталог для временных файлов, которые затем передаются в put
+    @abstractmethod
+    def temp_dir(self) -> Path:
+        ...
+
+    # Сохранение готового временного файла под ключом (файл забирается хранилищем)
+    @abstractmethod
+    async def put(self, key: str, tmp_path: str) -> None:
+        ...
+
+    # Путь к локальной копии объекта или None, если объекта нет
+    @abstractmethod
+    async def local_path(self, key: str) -> Optional[Path]:
+        ...
+
+    @abstractmethod
+    async def delete(self, keys: Iterable[str]) -> None:
+        ...
+
+
+class LocalImageStorage(ImageStorage):
+    """
+    Файловое хранилище: ключ - путь относительно корневого каталога.
+    tmp_dir должен быть на той же файловой системе, что и root, но вне раздаваемого каталога,
+    иначе недописанные файлы доступны по HTTP; по умолчанию - root/.tmp (для нераздаваемых каталогов).
+    """
+
+    def __init__(self, root: str, tmp_dir: Optional[str] = None):
+        self.root = Path(root)
+        self._tmp = Path(tmp_dir) if tmp_dir else self.root / ".tmp"
+        self._tmp.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / _check_key(key)
+
+    # Временные файлы лежат на той же файловой системе, что и хранилище, чтобы rename был атомарным
+    def temp_dir(self) -> Path:
+        return self._tmp
+
+    def _put(self, key: str, tmp_path: str) -> None:
+        target = self._path(key)
+        if target.exists():
+            os.remove(tmp_path)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp создает файл с правами 0600, отдаваемые изображения должны быть доступны на чтение
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+
+    async def put(self, key: str, tmp_path: str) -> None:
+        await asyncio.to_thread(self._put, key, tmp_path)
+
+    async def local_path(self, key: str) -> Optional[Path]:
+        path = self._path(key)
+        return path if await asyncio.to_thread(path.exists) else None
+
+    def _delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        await asyncio.to_thread(self._delete, list(keys))
+
+
+class S3ImageStorage(ImageStorage):
+    """
+    S3-совместимое хранилище (AWS S3, MinIO и т.п.), общее для всех реплик бэкенда.
+    Прочитанные объекты кэшируются на локальном диске в cache_dir.
+    Требует пакет boto3.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        cache_dir: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+    ):
+        import boto3
+        from botocore.exceptions import ClientError
+
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache = LocalImageStorage(cache_dir)
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + _check_key(key)
+
+    def _is_not_found(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def temp_dir(self) -> Path:
+        return self.cache.temp_dir()
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self._client_error as e:
+            if self._is_not_found(e):
+                return False
+            raise
+
+    def _upload(self, key: str, tmp_path: str) -> None:
+        if self._exists(key):
+            return
+        self._client.upload_file(
+            tmp_path, self.bucket, self._object_key(key),
+            ExtraArgs={
+                "ContentType": mimetypes.guess_type(key)[0] or "application/octet-stream",
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+        )
+
+    async def put(self, key: str, tmp_path: str) -> None:
+        try:
+            await asyncio.to_thread(self._upload, key, tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        # Загруженный файл сразу становится локальной копией
+        await self.cache.put(key, tmp_path)
+
+    def _download(self, key: str) -> bool:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache.temp_dir(), suffix=".part")
+        os.close(fd)
+        try:
+            self._client.download_file(self.bucket, self._object_key(key), tmp_path)
+        except self._client_error as e:
+            os.remove(tmp_path)
+            if self._is_not_found(e):
+                return False
+            raise
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.cache._put(key, tmp_path)
+        return True
+
+    async def local_path(self, key: str) -> Optional[Path]:
+        path = await self.cache.local_path(key)
+        if path is not None:
+            return path
+        if not await asyncio.to_thread(self._download, key):
+            return None
+        return await self.cache.local_path(key)
+
+    def _delete(self, keys) -> None:
+        for start in range(0, len(keys), 1000):
+            self._client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": self._object_key(key)} for key in keys[start:start + 1000]], "Quiet": True},
+            )
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            await asyncio.to_thread(self._delete, keys)
+        await self.cache.delete(keys)
+
+
+_storage: Optional[ImageStorage] = None
+
+
+def get_image_storage() -> ImageStorage:
+    """Хранилище изображений, выбранное настройкой IMAGE_STORAGE_BACKEND (создается при первом обращении)"""
+    global _storage
+    if _storage is None:
+        if settings.IMAGE_STORAGE_BACKEND == "s3":
+            _storage = S3ImageStorage(
+                bucket=settings.IMAGE_S3_BUCKET,
+                cache_dir=settings.IMAGE_S3_CACHE_DIR,
+                prefix=settings.IMAGE_S3_PREFIX,
+                endpoint_url=settings.IMAGE_S3_ENDPOINT_URL,
+                region_name=settings.IMAGE_S3_REGION,
+                access_key=settings.IMAGE_S3_ACCESS_KEY,
+                secret_key=settings.IMAGE_S3_SECRET_KEY,
+            )
+        else:
+            _storage = LocalImageStorage(settings.IMAGE_STORAGE_ROOT, settings.IMAGE_STORAGE_TMP_DIR)
+    return _storage
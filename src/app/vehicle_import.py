@@ -0,0 +1,273 @@
+from sqlalchemy import select, update, delete
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import uuid
+
+from .models import Vehicle, Category, Factory, Chassis, WheelFormula, Engine, ImportJob
+from .repository import VehicleRepository, PriceListRepository
+from .core.database import SessionLocal
+from .core.config import settings
+
+vehicle_repository = VehicleRepository()
+price_list_repository = PriceListRepository()
+
+# Колонки со ссылками на справочники: в файле может быть указан id или название
+REFERENCE_COLUMNS = {
+    "category": ("category_id", Category),
+    "factory": ("factory_id", Factory),
+    "chassis": ("chassis_id", Chassis),
+    "wheel_formula": ("wheel_formula_id", WheelFormula),
+    "engine": ("engine_id", Engine),
+}
+
+# Счетчики и ошибки задачи, которые сохраняются в import_jobs по мере выполнения
+JOB_PROGRESS_FIELDS = ("status", "processed", "created", "updated", "failed", "errors", "detail")
+
+_running_tasks = set()
+
+
+class VehicleImportRow(BaseModel):
+    vehicle_id: Optional[int] = None
+    title: str
+    description: Optional[str] = None
+    year: int
+    color: str
+    image_path: Optional[str] = None
+    category_id: Optional[int] = None
+    factory_id: Optional[int] = None
+    chassis_id: Optional[int] = None
+    wheel_formula_id: Optional[int] = None
+    engine_id: Optional[int] = None
+    price: Optional[int] = None
+    delivery_time: Optional[datetime] = None
+
+    @field_validator("delivery_time")
+    @classmethod
+    def strip_timezone(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return value.replace(tzinfo=None) if value is not None else None
+
+
+# Построчное чтение файла импорта: (номер строки, словарь значений или ошибка разбора)
+def read_rows(path: str, file_format: str) -> Iterator[tuple]:
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, {k.strip(): (v.strip() or None) for k, v in row.items() if k and v is not None}
+        else:
+            for line_num, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_num, f"Invalid JSON: {e}"
+                    continue
+                yield line_num, row if isinstance(row, dict) else "Row must be a JSON object"
+
+
+# Названия справочников -> id, загружаются один раз на импорт
+async def load_reference_maps(db) -> Dict[str, Dict[str, int]]:
+    maps = {}
+    for name, (id_column, model) in REFERENCE_COLUMNS.items():
+        result = await db.execute(select(getattr(model, id_column), model.name))
+        maps[name] = {row_name.strip().lower(): row_id for row_id, row_name in result.all()}
+    return maps
+
+
+def resolve_row(raw: Dict[str, Any], reference_maps: Dict[str, Dict[str, int]]) -> VehicleImportRow:
+    data = dict(raw)
+    for name, (id_column, _) in REFERENCE_COLUMNS.items():
+        value = data.pop(name, None)
+        if value is None or data.get(id_column) is not None:
+            continue
+        resolved = reference_maps[name].get(str(value).strip().lower())
+        if resolved is None:
+            raise ValueError(f"Unknown {name}: {value}")
+        data[id_column] = resolved
+    return VehicleImportRow.model_validate(data)
+
+
+# Запись одной пачки строк в отдельной транзакции
+async def import_chunk(db, chunk: List[tuple], user_id: int, is_admin: bool, job: Dict[str, Any]) -> None:
+    rows = [row for _, row in chunk]
+    lines = [line for line, _ in chunk]
+    errors = await vehicle_repository.find_invalid_references(db, [row.model_dump() for row in rows])
+
+    existing_ids = {row.vehicle_id for row in rows if row.vehicle_id is not None}
+    owners = {}
+    if existing_ids:
+        result = await db.execute(
+            select(Vehicle.vehicle_id, Vehicle.user_id).where(Vehicle.vehicle_id.in_(existing_ids))
+        )
+        owners = dict(result.all())
+
+    new_rows, update_rows = [], []
+    for index, row in enumerate(rows):
+        if errors[index] is None and row.vehicle_id is not None:
+            if row.vehicle_id not in owners:
+                errors[index] = f"Vehicle {row.vehicle_id} not found"
+            elif owners[row.vehicle_id] != user_id and not is_admin:
+                errors[index] = f"No permission to edit vehicle {row.vehicle_id}"
+        if errors[index] is None:
+            (update_rows if row.vehicle_id is not None else new_rows).append(index)
+
+    vehicle_fields = set(VehicleImportRow.model_fields) - {"vehicle_id", "price", "delivery_time"}
+    now = datetime.now()
+    created = await vehicle_repository.create_many(
+        db,
+        [{**rows[i].model_dump(include=vehicle_fields), "user_id": user_id, "publication_date": now} for i in new_rows],
+        commit=False
+    )
+    await vehicle_repository.update_many(
+        db,
+        [{**rows[i].model_dump(include=vehicle_fields, exclude_unset=True), "vehicle_id": rows[i].vehicle_id} for i in update_rows],
+        commit=False
+    )
+
+    vehicle_ids = {i: vehicle.vehicle_id for i, vehicle in zip(new_rows, created)}
+    vehicle_ids.update({i: rows[i].vehicle_id for i in update_rows})
+    priced = [i for i in vehicle_ids if rows[i].price is not None and rows[i].delivery_time is not None]
+
+    latest_price_ids = {}
+    priced_existing = [vehicle_ids[i] for i in priced if i in update_rows]
+    if priced_existing:
+        result = await db.execute(
+            select(Vehicle.vehicle_id, Vehicle.current_price_id)
+            .where(Vehicle.vehicle_id.in_(priced_existing), Vehicle.current_price_id.is_not(None))
+        )
+        latest_price_ids = dict(result.all())
+
+    price_inserts, price_updates = [], []
+    for i in priced:
+        price_data = {"price": rows[i].price, "delivery_time": rows[i].delivery_time}
+        price_id = latest_price_ids.get(vehicle_ids[i])
+        if price_id is not None:
+            price_updates.append({**price_data, "price_id": price_id})
+        else:
+            price_inserts.append({**price_data, "vehicle_id": vehicle_ids[i], "user_id": user_id})
+    await price_list_repository.create_many(db, price_inserts, commit=False)
+    await price_list_repository.update_many(db, price_updates, commit=False)
+
+    await db.commit()
+
+    job["created"] += len(new_rows)
+    job["updated"] += len(update_rows)
+    for index, error in enumerate(errors):
+        if error is not None:
+            add_error(job, lines[index], error)
+
+
+def add_error(job: Dict[str, Any], line: int, detail: str) -> None:
+    job["failed"] += 1
+    if len(job["errors"]) < settings.IMPORT_MAX_ERRORS:
+        job["errors"].append({"line": line, "detail": detail})
+
+
+# Сохранение прогресса задачи в import_jobs, чтобы состояние видели все воркеры
+async def save_job(job: Dict[str, Any]) -> None:
+    async with SessionLocal() as db:
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.job_id == job["job_id"])
+            .values(**{field: job[field] for field in JOB_PROGRESS_FIELDS}, updated_at=datetime.now())
+        )
+        await db.commit()
+
+
+async def run_import(job: Dict[str, Any], path: str, file_format: str, user_id: int, is_admin: bool) -> None:
+    """Импорт файла пачками по IMPORT_CHUNK_SIZE строк, каждая пачка в своей транзакции"""
+    try:
+        async with SessionLocal() as db:
+            reference_maps = await load_reference_maps(db)
+            rows = read_rows(path, file_format)
+            while True:
+                raw_chunk = await asyncio.to_thread(
+                    lambda: [item for _, item in zip(range(settings.IMPORT_CHUNK_SIZE), rows)]
+                )
+                if not raw_chunk:
+                    break
+
+                chunk = []
+                for line, raw in raw_chunk:
+                    if isinstance(raw, str):
+                        add_error(job, line, raw)
+                        continue
+                    try:
+                        chunk.append((line, resolve_row(raw, reference_maps)))
+                    except ValidationError as e:
+                        add_error(job, line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                    except ValueError as e:
+                        add_error(job, line, str(e))
+
+                if chunk:
+                    try:
+                        await import_chunk(db, chunk, user_id, is_admin, job)
+                    except Exception as e:
+                        await db.rollback()
+                        for line, _ in chunk:
+                            add_error(job, line, f"Chunk failed: {e}")
+
+                job["processed"] += len(raw_chunk)
+                await save_job(job)
+        job["status"] = "completed"
+    except Exception as e:
+        job["status"] = "failed"
+        job["detail"] = str(e)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        # Итог сохраняется и при ошибке; если и это не удалось, задача будет признана прерванной
+        # по IMPORT_JOB_STALE_SECONDS
+        try:
+            await save_job(job)
+        except Exception as e:
+            print(f"Import job {job['job_id']} save error: {e}")
+
+
+async def start_import(db, path: str, file_format: str, user_id: int, is_admin: bool) -> Dict[str, Any]:
+    """Регистрация задачи в import_jobs и запуск импорта в фоне; задачи старше IMPORT_JOB_TTL_SECONDS удаляются"""
+    now = datetime.now()
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "status": "running",
+        "processed": 0,
+        "created": 0,
+        "updated": 0,
+        "failed": 0,
+        "errors": [],
+        "detail": None,
+    }
+    await db.execute(delete(ImportJob).where(ImportJob.created_at < now - timedelta(seconds=settings.IMPORT_JOB_TTL_SECONDS)))
+    db.add(ImportJob(**job, created_at=now, updated_at=now))
+    await db.commit()
+
+    task = asyncio.create_task(run_import(job, path, file_format, user_id, is_admin))
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+    return job
+
+
+async def load_import_job(db, job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Состояние задачи импорта.
+    Задача, прогресс которой не обновлялся дольше IMPORT_JOB_STALE_SECONDS (воркер перезапущен
+    во время импорта), считается прерванной.
+    """
+    job = await db.get(ImportJob, job_id)
+    if job is None:
+        return None
+
+    result = {field: getattr(job, field) for field in ("job_id", "user_id", *JOB_PROGRESS_FIELDS)}
+    stale_before = datetime.now() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+    if job.status == "running" and job.updated_at < stale_before:
+        result["status"] = "failed"
+        result["detail"] = "Import was interrupted"
+    return result
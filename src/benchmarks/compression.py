@@ -0,0 +1,106 @@
+"""
+Сжатие ответов API (CompressionMiddleware): размер на проводе для типичных JSON-ответов при
+COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY и COMPRESSION_MIN_SIZE из настроек,
+а также время и размер сжатия большого ответа на разных уровнях.
+Запуск из каталога src: python -m benchmarks.compression [--vehicles 1000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import time
+
+from tests.support import Database
+from app.core.compression import _BrotliCompressor, _GzipCompressor, brotli
+from app.core.config import settings
+from app.models import Category, Requests, Vehicle
+
+# Словарь из случайных слов: описания получаются разнообразными, а не из десятка повторяющихся слов
+_rng = random.Random(0)
+WORDS = [
+    "".join(_rng.choices("абвгдеежзийклмнопрстуфхцчшщыэюя", k=_rng.randint(3, 11))) for _ in range(3000)
+]
+
+URLS = ("/vehicles/?limit=1", "/vehicles/?limit=100", "/vehicles/?limit={vehicles}", "/requests/?limit={vehicles}")
+LEVELS = (("gzip", (1, 6, 9)), ("br", (1, 4, 6, 11)))
+
+
+async def seed(database: Database, user, vehicles: int) -> None:
+    rng = random.Random(0)
+    async with database.session() as db:
+        category = Category(name="Самосвалы")
+        db.add(category)
+        await db.flush()
+        db.add_all(
+            Vehicle(
+                title=f"{rng.choice(WORDS).capitalize()} {rng.randint(100, 9999)}",
+                description=" ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                year=rng.randint(1995, 2025), color=rng.choice(("red", "yellow", "white", "blue")),
+                user_id=user.user_id, category_id=category.category_id,
+                current_price=rng.randint(1_000_000, 30_000_000),
+            )
+            for _ in range(vehicles)
+        )
+        db.add_all(
+            Requests(
+                session_id=i, full_name=f"Клиент {i}", email=f"client{i}@example.com", phone="+70000000000",
+                city=rng.choice(("Москва", "Казань", "Самара")), request_date=datetime.datetime(2025, 1, 1),
+                payment_method=Requests.PaymentMethodEnum.CASH, delivery_type=Requests.DeliveryTypeEnum.PICKUP,
+                status=Requests.RequestStatusEnum.CREATED, user_id=user.user_id,
+            )
+            for i in range(vehicles)
+        )
+        await db.commit()
+
+
+def compress_time(compressor_class, level: int, body: bytes, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(compressor_class(level).compress(body, last=True))
+        timings.append(time.perf_counter() - started)
+    return size, min(timings) * 1000
+
+
+async def main(vehicles: int, repeat: int) -> None:
+    encodings = ("gzip", "br") if brotli is not None else ("gzip",)
+    database = Database()
+    user = await database.create()
+    try:
+        await seed(database, user, vehicles)
+        print(
+            f"Размер на проводе (gzip {settings.COMPRESSION_GZIP_LEVEL}, br {settings.COMPRESSION_BROTLI_QUALITY}, "
+            f"минимум {settings.COMPRESSION_MIN_SIZE} Б):"
+        )
+        largest = b""
+        async with database.client(user) as client:
+            for url in URLS:
+                url = url.format(vehicles=vehicles)
+                sizes = []
+                for encoding in ("identity", *encodings):
+                    response = await client.get(url, headers={"Accept-Encoding": encoding})
+                    assert response.status_code == 200
+                    wire = response.headers.get("content-length") or len(response.content)
+                    sizes.append(f"{encoding} {wire} Б ({response.headers.get('content-encoding', '-')})")
+                    if encoding == "identity" and len(response.content) > len(largest):
+                        largest = response.content
+                print(f"  {url}: " + ", ".join(sizes))
+    finally:
+        await database.engine.dispose()
+
+    print(f"Сжатие ответа {len(largest)} Б, лучшее из {repeat}:")
+    compressors = {"gzip": _GzipCompressor, "br": _BrotliCompressor}
+    for encoding, levels in LEVELS:
+        if encoding not in encodings:
+            continue
+        for level in levels:
+            size, elapsed = compress_time(compressors[encoding], level, largest, 1 if level == 11 else repeat)
+            print(f"  {encoding} {level}: {size} Б, {elapsed:.1f} мс")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vehicles", type=int, default=1000, help="число ТС и заявок")
+    parser.add_argument("--repeat", type=int, default=5, help="число повторов замера сжатия")
+    args = parser.parse_args()
+    asyncio.run(main(args.vehicles, args.repeat))
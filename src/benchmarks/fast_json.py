@@ -0,0 +1,103 @@
+"""
+Список ТС из 10k строк: путь через ORM и response_model против get_rows + FastJSONResponse.
+Замеряются этапы (выборка, валидация/сериализация, кодирование JSON) и ответ приложения целиком:
+GET /vehicles/?cursor= (ORM-объекты и response_model) и GET /vehicles/ (строки и FastJSONResponse).
+Запуск из каталога src: python -m benchmarks.fast_json [--vehicles 10000] [--repeat 5]
+"""
+from typing import List
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import select
+
+from tests.support import Database
+from app.models import Category, Vehicle
+from app.repository import BaseRepository
+from app.schemas import VehicleFull
+
+
+async def best_of(repeat: int, measure) -> tuple:
+    """Лучшее время и результат последнего прогона"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await measure()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+async def main(vehicles: int, repeat: int) -> None:
+    database = Database()
+    user = await database.create()
+    repository = BaseRepository(Vehicle)
+    adapter = TypeAdapter(List[VehicleFull])
+    try:
+        async with database.session() as db:
+            category = Category(name="Самосвалы")
+            db.add(category)
+            await db.flush()
+            db.add_all(
+                Vehicle(
+                    title=f"Vehicle {i}", description=f"Описание {i}", year=2000 + i % 25, color="red",
+                    user_id=user.user_id, category_id=category.category_id,
+                    current_price=1000 + i, current_price_id=i + 1,
+                )
+                for i in range(vehicles)
+            )
+            await db.commit()
+
+        async def orm_fetch():
+            async with database.session() as db:
+                result = await db.execute(select(Vehicle).order_by(Vehicle.vehicle_id).limit(vehicles))
+                return result.scalars().all()
+
+        async def rows_fetch():
+            async with database.session() as db:
+                return await repository.get_rows(db, VehicleFull, limit=vehicles)
+
+        orm_ms, objects = await best_of(repeat, orm_fetch)
+
+        async def validate_dump():
+            return adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+
+        dump_ms, content = await best_of(repeat, validate_dump)
+
+        async def json_dumps():
+            return JSONResponse(content).body
+
+        dumps_ms, orm_body = await best_of(repeat, json_dumps)
+        rows_ms, rows = await best_of(repeat, rows_fetch)
+
+        async def rust_dump():
+            return to_json(rows)
+
+        to_json_ms, fast_body = await best_of(repeat, rust_dump)
+
+        print(f"{vehicles} ТС, лучшее из {repeat}")
+        print(f"  ORM:     выборка {orm_ms:.0f} мс + валидация/сериализация {dump_ms:.0f} мс + json.dumps {dumps_ms:.0f} мс")
+        print(f"  строки:  выборка {rows_ms:.0f} мс + to_json {to_json_ms:.0f} мс")
+        print(f"  тела совпадают побайтно: {orm_body == fast_body} ({len(fast_body):,} Б)")
+
+        async with database.client(user) as client:
+            async def request(params: dict):
+                response = await client.get("/vehicles/", params={"limit": vehicles, **params})
+                assert response.status_code == 200
+                return response.content
+
+            orm_app_ms, orm_response = await best_of(repeat, lambda: request({"cursor": ""}))
+            fast_app_ms, fast_response = await best_of(repeat, lambda: request({}))
+        print(f"  через приложение: {orm_app_ms:.0f} мс -> {fast_app_ms:.0f} мс, ответы совпадают: {orm_response == fast_response}")
+    finally:
+        await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vehicles", type=int, default=10000, help="число ТС")
+    parser.add_argument("--repeat", type=int, default=5, help="число повторов каждого замера")
+    args = parser.parse_args()
+    asyncio.run(main(args.vehicles, args.repeat))
@@ -0,0 +1,154 @@
+"""
+Планы и время выполнения (EXPLAIN ANALYZE) горячих запросов по индексам из миграции 4b7e2c91d0a3.
+Работает с базой PostgreSQL из настроек приложения (.env). Значения параметров берутся из первых строк таблиц.
+С --seed N в пустую базу сначала создаются таблицы fill_db_models (как в init.py) и N ТС со связанными
+данными, затем выполняется ANALYZE; на маленькой базе планировщик выбирает Seq Scan при любых индексах.
+С --without-indexes запросы выполняются еще раз после DROP INDEX в той же транзакции, которая затем
+откатывается: индексы остаются, но на время замера таблицы блокируются - не запускать на рабочей базе.
+Запуск из каталога src: python -m benchmarks.index_plans [--seed 200000] [--without-indexes]
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+# Наполнение на N ТС: справочники, пользователи, по 3 цены на ТС, заявки с 2 позициями, новости, токены
+SEED_STATEMENTS = (
+    "INSERT INTO users (email, password_hash, name, is_active, is_admin) "
+    "SELECT 'user' || i || '@example.com', 'hash', 'User ' || i, true, false "
+    "FROM generate_series(1, greatest(:n / 100, 10)) AS i",
+    *(
+        f"INSERT INTO {table} (name) SELECT '{table} ' || i FROM generate_series(1, {count}) AS i"
+        for table, count in (
+            ("categories", 20), ("chassis", 10), ("factories", 10), ("wheel_formulas", 10), ("engines", 10),
+        )
+    ),
+    "INSERT INTO vehicles (title, description, year, color, category_id, factory_id, chassis_id, "
+    "wheel_formula_id, engine_id, user_id) "
+    "SELECT 'Vehicle ' || i, 'Описание ' || i, 2000 + i % 25, 'red', 1 + i % 20, 1 + i % 10, 1 + i % 10, "
+    "1 + i % 10, 1 + i % 10, 1 + i % greatest(:n / 100, 10) FROM generate_series(1, :n) AS i",
+    "INSERT INTO price_list (price, delivery_time, user_id, vehicle_id) "
+    "SELECT 1000000 + (i::bigint * 7919) % 9000000, now() + (i % 90) * interval '1 day', "
+    "1 + i % greatest(:n / 100, 10), 1 + i % :n FROM generate_series(1, :n * 3) AS i",
+    "UPDATE vehicles AS v SET current_price_id = p.price_id, current_price = p.price, "
+    "current_delivery_time = p.delivery_time "
+    "FROM (SELECT DISTINCT ON (vehicle_id) vehicle_id, price_id, price, delivery_time "
+    "FROM price_list ORDER BY vehicle_id, price_id DESC) AS p WHERE p.vehicle_id = v.vehicle_id",
+    "INSERT INTO requests (session_id, full_name, email, phone, city, request_date, payment_method, "
+    "delivery_type, status, user_id) "
+    "SELECT i, 'Client ' || i, 'client' || i || '@example.com', '+70000000000', 'Москва', "
+    "now() - (i % 365) * interval '1 day', 'CASH'::paymentmethodenum, 'PICKUP'::deliverytypeenum, "
+    "(ARRAY['CREATED', 'PROCESSING', 'RECEIVED', 'COMPLETED'])[1 + i % 4]::requeststatusenum, "
+    "1 + i % greatest(:n / 100, 10) FROM generate_series(1, :n / 2) AS i",
+    "INSERT INTO requisitioned_goods (request_id, vehicle_id, quantity) "
+    "SELECT r, 1 + (r * 2 + k) % :n, 1 FROM generate_series(1, :n / 2) AS r, generate_series(0, 1) AS k",
+    "INSERT INTO news (title, publication_date, content, user_id) "
+    "SELECT 'News ' || i, now() - i * interval '1 hour', 'Текст новости', 1 + i % greatest(:n / 100, 10) "
+    "FROM generate_series(1, greatest(:n / 10, 1)) AS i",
+    "INSERT INTO token_blacklist (token_jti, revoked_at, expires_at) "
+    "SELECT md5(i::text), now() - (i % 10080) * interval '1 minute', now() + (i % 1440 - 60) * interval '1 minute' "
+    "FROM generate_series(1, :n) AS i",
+)
+
+# Значения параметров запросов (первое попавшееся в данных)
+PARAMETERS = {
+    "category_id": "SELECT category_id FROM vehicles WHERE category_id IS NOT NULL LIMIT 1",
+    "user_id": "SELECT user_id FROM vehicles LIMIT 1",
+    "vehicle_id": "SELECT vehicle_id FROM price_list LIMIT 1",
+}
+
+QUERIES = {
+    "ТС категории (keyset)": (
+        "SELECT * FROM vehicles WHERE category_id = :category_id AND vehicle_id > 0 ORDER BY vehicle_id LIMIT 100"
+    ),
+    "ТС пользователя": "SELECT * FROM vehicles WHERE user_id = :user_id",
+    "последняя цена ТС": "SELECT * FROM price_list WHERE vehicle_id = :vehicle_id ORDER BY price_id DESC LIMIT 1",
+    "цены пользователя": "SELECT * FROM price_list WHERE user_id = :user_id",
+    "заявки пользователя": "SELECT * FROM requests WHERE user_id = :user_id",
+    "заявки по статусу": "SELECT * FROM requests WHERE status = 'CREATED'",
+    "заявки с ТС": "SELECT * FROM requisitioned_goods WHERE vehicle_id = :vehicle_id",
+    "лента новостей": "SELECT * FROM news ORDER BY publication_date DESC, news_id DESC LIMIT 20",
+    "новости пользователя": "SELECT * FROM news WHERE user_id = :user_id",
+    "очистка токенов": "SELECT id FROM token_blacklist WHERE expires_at < now() LIMIT 1000",
+    "подгрузка фильтра отзыва": "SELECT token_jti FROM token_blacklist WHERE revoked_at >= now() - interval '1 minute'",
+}
+
+INDEXES = (
+    "ix_vehicles_category_id_vehicle_id", "ix_vehicles_user_id",
+    "ix_price_list_vehicle_id_price_id", "ix_price_list_user_id",
+    "ix_requests_user_id", "ix_requests_status", "ix_requisitioned_goods_vehicle_id",
+    "ix_news_publication_date_news_id", "ix_news_user_id",
+    "ix_token_blacklist_expires_at", "ix_token_blacklist_revoked_at",
+)
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def explain_all(connection, parameters: dict) -> None:
+    for name, query in QUERIES.items():
+        result = await connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), parameters)
+        plan = result.scalar()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+        nodes = list(_plan_nodes(plan["Plan"]))
+        scans = ", ".join(
+            f'{node["Node Type"]} {node.get("Index Name", node.get("Relation Name", ""))}'.strip()
+            for node in nodes if "Scan" in node["Node Type"]
+        )
+        print(f"  {name}: {plan['Execution Time']:.3f} мс, {scans}")
+
+
+async def seed(vehicles: int) -> None:
+    # Таблицы - из тех же моделей, что init.py (модуль импортируется из каталога app, как при его запуске)
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+    import fill_db_models
+
+    async with engine.begin() as connection:
+        await connection.run_sync(fill_db_models.Base.metadata.create_all)
+        if (await connection.execute(text("SELECT count(*) FROM vehicles"))).scalar():
+            raise SystemExit("--seed: таблица vehicles не пуста, наполнение выполняется только в пустую базу")
+        for statement in SEED_STATEMENTS:
+            await connection.execute(text(statement), {"n": vehicles})
+        await connection.execute(text("ANALYZE"))
+    print(f"Наполнено: {vehicles} ТС")
+
+
+async def main(without_indexes: bool, vehicles: int) -> None:
+    if vehicles:
+        await seed(vehicles)
+
+    async with engine.connect() as connection:
+        parameters = {
+            name: (await connection.execute(text(query))).scalar() or 0
+            for name, query in PARAMETERS.items()
+        }
+        print(f"Параметры: {parameters}")
+        print("С индексами:")
+        await explain_all(connection, parameters)
+
+        if without_indexes:
+            transaction = await connection.begin_nested()
+            try:
+                for index in INDEXES:
+                    await connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+                print("Без индексов:")
+                await explain_all(connection, parameters)
+            finally:
+                await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0, metavar="N", help="наполнить пустую базу N ТС перед замером")
+    parser.add_argument("--without-indexes", action="store_true", help="повторить замер без индексов (с откатом)")
+    args = parser.parse_args()
+    asyncio.run(main(args.without_indexes, args.seed))
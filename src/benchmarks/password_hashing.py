@@ -0,0 +1,54 @@
+"""
+Задержка event loop при пачке одновременных проверок пароля (PBKDF2): проверка прямо в event loop
+против verify_password в пуле потоков PASSWORD_HASH_WORKERS.
+Запуск из каталога src: python -m benchmarks.password_hashing [--logins 40]
+"""
+import argparse
+import asyncio
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import tests.support  # noqa: F401 - переменные окружения для настроек приложения
+from app.core.auth_utils import verify_password
+from app.models import User
+
+
+async def inline_verify(user: User, password: str) -> bool:
+    return check_password_hash(user.password_hash, password)
+
+
+async def max_loop_lag(verify, user: User, logins: int) -> tuple:
+    """Максимальная задержка тиков event loop (интервал 1 мс) и общее время пачки"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify(user, "password") for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker_task
+    assert all(results)
+    return max(lags), elapsed
+
+
+async def main(logins: int) -> None:
+    user = User(email="user@example.com", password_hash=generate_password_hash("password"))
+    for name, verify in (("в event loop", inline_verify), ("в пуле потоков", verify_password)):
+        lag, elapsed = await max_loop_lag(verify, user, logins)
+        print(f"{name}: максимальная задержка event loop {lag * 1000:.0f} мс, пачка из {logins} за {elapsed:.2f} с")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40, help="число одновременных проверок пароля")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
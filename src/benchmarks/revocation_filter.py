@@ -0,0 +1,70 @@
+"""
+Замер проверки отзыва токенов (is_token_revoked) с Bloom-фильтром и без него, а также доли
+ложных срабатываний фильтра при заполнении до REVOCATION_FILTER_CAPACITY.
+Запуск из каталога src: python -m benchmarks.revocation_filter [--tokens 2000] [--revoked 1000]
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import time
+import uuid
+
+from tests.support import Database
+from app.core import auth_utils
+from app.core.bloom_filter import BloomFilter
+from app.core.config import settings
+from app.models import TokenBlacklist
+
+
+async def measure(database: Database, revocation_filter, jtis) -> tuple:
+    auth_utils.revoked_tokens_filter = revocation_filter
+    auth_utils.revoked_tokens_cache.clear()
+    database.statements.clear()
+    async with database.session() as db:
+        started = time.perf_counter()
+        for jti in jtis:
+            assert not await auth_utils.is_token_revoked(db, jti)
+        elapsed = time.perf_counter() - started
+    return elapsed / len(jtis) * 1e6, len(database.statements)
+
+
+async def main(tokens: int, revoked: int) -> None:
+    # Один воркер: фильтру доверяют без подписки на LISTEN/NOTIFY (в SQLite ее нет)
+    settings.AUTH_SHARED_INVALIDATION = False
+
+    database = Database()
+    await database.create()
+    try:
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        async with database.session() as db:
+            db.add_all(TokenBlacklist(token_jti=str(uuid.uuid4()), expires_at=expires_at) for _ in range(revoked))
+            await db.commit()
+
+        jtis = [str(uuid.uuid4()) for _ in range(tokens)]
+        loaded = auth_utils.RevokedTokensFilter()
+        async with database.session() as db:
+            await loaded.rebuild(db)
+
+        for name, revocation_filter in (("без фильтра", auth_utils.RevokedTokensFilter()), ("с фильтром", loaded)):
+            per_check, statements = await measure(database, revocation_filter, jtis)
+            print(f"{name}: {per_check:.1f} мкс на проверку, запросов к БД: {statements}")
+    finally:
+        await database.engine.dispose()
+
+    bloom = BloomFilter(settings.REVOCATION_FILTER_CAPACITY, settings.REVOCATION_FILTER_ERROR_RATE)
+    for _ in range(bloom.capacity):
+        bloom.add(str(uuid.uuid4()))
+    probes = 100000
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(probes))
+    print(
+        f"ложные срабатывания при {bloom.capacity} jti: {false_positives / probes:.3%}, "
+        f"размер фильтра {(bloom.size + 7) // 8 / 1024:.0f} КБ"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=2000, help="число проверяемых неотозванных токенов")
+    parser.add_argument("--revoked", type=int, default=1000, help="число отозванных токенов в черном списке")
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.revoked))
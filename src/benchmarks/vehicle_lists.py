@@ -0,0 +1,54 @@
+"""
+Время ответа и число SQL-запросов списка ТС пользователя (GET /vehicles/user/{id})
+без раскрытия связей (строки словарями) и с expand (один запрос с joinedload).
+Запуск из каталога src: python -m benchmarks.vehicle_lists [--vehicles 5000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+
+from tests.support import Database
+from app.models import Category, Vehicle
+
+
+async def main(vehicles: int, repeat: int) -> None:
+    database = Database()
+    user = await database.create()
+    try:
+        async with database.session() as db:
+            category = Category(name="Самосвалы")
+            db.add(category)
+            await db.flush()
+            db.add_all(
+                Vehicle(
+                    title=f"Vehicle {i}", year=2020, color="red", user_id=user.user_id,
+                    category_id=category.category_id, current_price=1000 + i,
+                )
+                for i in range(vehicles)
+            )
+            await db.commit()
+
+        async with database.client(user) as client:
+            for expand in (None, "category", "all"):
+                params = {"expand": expand} if expand else {}
+                timings = []
+                for _ in range(repeat):
+                    database.statements.clear()
+                    started = time.perf_counter()
+                    response = await client.get(f"/vehicles/user/{user.user_id}", params=params)
+                    timings.append(time.perf_counter() - started)
+                    assert response.status_code == 200 and len(response.json()) == vehicles
+                print(
+                    f"expand={expand or '-'}: лучшее из {repeat} {min(timings) * 1000:.0f} мс, "
+                    f"запросов к БД: {len(database.statements)}"
+                )
+    finally:
+        await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vehicles", type=int, default=5000, help="число ТС пользователя")
+    parser.add_argument("--repeat", type=int, default=5, help="число повторов каждого запроса")
+    args = parser.parse_args()
+    asyncio.run(main(args.vehicles, args.repeat))
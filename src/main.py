@@ -1,20 +1,52 @@
 from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import os
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
-from datetime import datetime
-from fastapi.responses import JSONResponse, Response, FileResponse
-from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from fastapi import Request, Depends
 
 from app.routers import main_router
-from app.core.auth_utils import cleanup_expired_tokens
-from app.core.dependencies import get_db
+from app.core.auth_utils import (
+    run_token_cleanup_scheduler, load_revoked_tokens_filter, run_revoked_tokens_filter_refresher,
+    password_executor, auth_invalidation_listener
+)
+from app.image_variants import variant_executor
+from app.core.dependencies import get_current_admin_user
+from app.core.database import get_pool_stats
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.config import BASE_DIR, settings
+from app.core.compression import CompressionMiddleware
+from app.core.static_files import StaticAssets
+
+static_assets = StaticAssets(os.path.join(BASE_DIR, "static"))
+
+# Запуск фоновых задач на время жизни приложения
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await load_revoked_tokens_filter()
+    await asyncio.to_thread(static_assets.build)
+    tasks = [
+        asyncio.create_task(run_token_cleanup_scheduler()),
+        asyncio.create_task(run_revoked_tokens_filter_refresher()),
+        asyncio.create_task(auth_invalidation_listener.run()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    password_executor.shutdown(wait=False, cancel_futures=True)
+    variant_executor.shutdown(wait=False, cancel_futures=True)
 
 # Создание экземпляра FastAPI
 app = FastAPI(
     title="Vehicle Service API", 
     description="API for managing and selling vehicles", 
-    version="1.0.0" 
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Настройка CORS
@@ -24,40 +56,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
+)
+
+# Сжатие ответов gzip/brotli
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
 # Обработка запросов favicon.ico
 @app.get("/favicon.ico", include_in_schema=False)
-async def favicon():
-    return FileResponse("src/static/favicon.ico")
+async def favicon(request: Request):
+    return await static_assets.serve(request, "favicon.ico")
+
+# Состояние пула соединений БД (для подбора размера пула под число воркеров)
+@app.get("/pool-stats", include_in_schema=False, dependencies=[Depends(get_current_admin_user)])
+async def pool_stats():
+    return get_pool_stats()
 
 # Подключение всех роутеров
 app.include_router(main_router)
 
 # Монтируем статические файлы
-app.mount("/static", StaticFiles(directory="src/static"), name="static")
-
-# Middleware для автоматической очистки устаревших токенов
-@app.middleware("http")
-async def token_cleanup_middleware(request: Request, call_next):
-    try:
-        async for db in get_db():
-            if hash(datetime.now().minute) % 100 == 0:
-                try:
-                    await cleanup_expired_tokens(db)
-                except Exception as e:
-                    print(f"Token cleanup error: {e}")
-                    
-            response = await call_next(request)
-            return response
-    except Exception as e:
-        import traceback
-        print(f"Middleware error: {e}")
-        print(traceback.format_exc())
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal Server Error"}
-        )
+app.mount("/static", static_assets, name="static")
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)  # Запуск сервера
\ No newline at end of file
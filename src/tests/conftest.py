@@ -0,0 +1,10 @@
+import pytest
+
+from tests.support import Database, app
+
+
+@pytest.fixture
+def database():
+    database = Database()
+    yield database
+    app.dependency_overrides.clear()
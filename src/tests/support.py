@@ -0,0 +1,52 @@
+import os
+
+# Настройки читаются при импорте приложения; тестам и замерам нужна только SQLite в памяти
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASS", "test")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.dependencies import get_db, get_current_active_user, get_current_admin_user
+from app.models import User
+from main import app
+
+
+class Database:
+    """SQLite в памяти со счетчиком выполненных SQL-запросов"""
+
+    def __init__(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.statements = []
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    async def create(self) -> User:
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with self.session() as db:
+            admin = User(email="admin@example.com", name="admin", is_active=True, is_admin=True)
+            admin.password = "admin"
+            db.add(admin)
+            await db.commit()
+        return admin
+
+    def client(self, user: User) -> httpx.AsyncClient:
+        async def override_get_db():
+            async with self.session() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_current_admin_user] = lambda: user
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
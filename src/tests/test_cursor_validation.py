@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.models import Vehicle
+from app.repository import encode_cursor
+
+
+async def _get(database, url: str, cursor: str):
+    user = await database.create()
+    async with database.session() as db:
+        db.add_all(Vehicle(title=f"Vehicle {i}", year=2020, color="red", user_id=user.user_id) for i in range(3))
+        await db.commit()
+    try:
+        async with database.client(user) as client:
+            return await client.get(url, params={"cursor": cursor, "limit": 2})
+    finally:
+        await database.engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "url, values",
+    [
+        ("/vehicles/", [{"a": 1}]),
+        ("/vehicles/", ["abc"]),
+        ("/vehicles/", [True]),
+        ("/vehicles/", [None]),
+        ("/vehicles/", [1, 2]),
+        ("/news/", ["not a date", 1]),
+        ("/news/", [1, 1]),
+        ("/requisitioned-goods/", [1, "abc"]),
+    ],
+)
+def test_wrongly_typed_cursor_is_rejected(database, url, values):
+    response = asyncio.run(_get(database, url, encode_cursor(values)))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_valid_cursor_returns_next_page(database):
+    response = asyncio.run(_get(database, "/vehicles/", encode_cursor([1])))
+
+    assert response.status_code == 200
+    assert [vehicle["vehicle_id"] for vehicle in response.json()] == [2, 3]
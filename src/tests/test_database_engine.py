@@ -0,0 +1,36 @@
+import asyncio
+
+import asyncpg
+from sqlalchemy.util import greenlet_spawn
+
+import tests.support  # noqa: F401 - переменные окружения для настроек приложения
+from app.core.database import make_engine
+
+
+async def _connect(statement_cache_size: int, monkeypatch):
+    received = {}
+
+    async def fake_connect(*args, **kwargs):
+        received.update(kwargs)
+        return object()
+
+    monkeypatch.setattr(asyncpg, "connect", fake_connect)
+    engine = make_engine(statement_cache_size)
+    # Соединение создается напрямую через creator пула, без запросов инициализации диалекта
+    connection = await greenlet_spawn(engine.pool._creator)
+    return connection, received
+
+
+def test_zero_statement_cache_size_disables_both_caches(monkeypatch):
+    connection, received = asyncio.run(_connect(0, monkeypatch))
+
+    assert received["statement_cache_size"] == 0
+    assert "prepared_statement_cache_size" not in received
+    assert connection._prepared_statement_cache is None
+
+
+def test_statement_cache_size_sets_dialect_cache(monkeypatch):
+    connection, received = asyncio.run(_connect(50, monkeypatch))
+
+    assert received["statement_cache_size"] == 50
+    assert connection._prepared_statement_cache.capacity == 50
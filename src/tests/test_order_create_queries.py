@@ -0,0 +1,48 @@
+import asyncio
+
+from app.models import Vehicle
+
+
+async def _count_create_statements(database, item_counts):
+    user = await database.create()
+    async with database.session() as db:
+        vehicles = [
+            Vehicle(title=f"Vehicle {i}", year=2020, color="red", user_id=user.user_id)
+            for i in range(max(item_counts))
+        ]
+        db.add_all(vehicles)
+        await db.commit()
+        vehicle_ids = [vehicle.vehicle_id for vehicle in vehicles]
+
+    counts = {}
+    try:
+        async with database.client(user) as client:
+            for items in item_counts:
+                order = {
+                    "session_id": 1,
+                    "full_name": "Иван Иванов",
+                    "email": "ivan@example.com",
+                    "phone": "+70000000000",
+                    "city": "Москва",
+                    "payment_method": "наличные",
+                    "delivery_type": "самовывоз",
+                    "tovary_v_zayavke": [
+                        {"vehicle_id": vehicle_id, "quantity": 1, "name": "Vehicle", "price": 1000}
+                        for vehicle_id in vehicle_ids[:items]
+                    ],
+                }
+                database.statements.clear()
+                response = await client.post("/requests/create-order", json=order)
+                assert response.status_code == 201, response.text
+                counts[items] = len(database.statements)
+    finally:
+        await database.engine.dispose()
+    return counts
+
+
+def test_create_order_statement_count_does_not_grow_with_items(database):
+    counts = asyncio.run(_count_create_statements(database, (1, 10, 100)))
+
+    # Проверка ТС, заявка и все позиции одним INSERT ... VALUES
+    assert len(set(counts.values())) == 1, counts
+    assert counts[1] <= 3, counts
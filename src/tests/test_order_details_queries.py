@@ -0,0 +1,58 @@
+import asyncio
+import datetime
+
+from app.models import Requests, TovaryVZayavke, Vehicle
+
+
+async def _create_order(database, user, items: int) -> int:
+    async with database.session() as db:
+        order = Requests(
+            session_id=1,
+            full_name="Иван Иванов",
+            email="ivan@example.com",
+            phone="+70000000000",
+            city="Москва",
+            request_date=datetime.datetime(2025, 1, 1),
+            payment_method=Requests.PaymentMethodEnum.CASH,
+            delivery_type=Requests.DeliveryTypeEnum.PICKUP,
+            status=Requests.RequestStatusEnum.CREATED,
+            user_id=user.user_id,
+        )
+        vehicles = [
+            Vehicle(title=f"Vehicle {i}", year=2020, color="red", user_id=user.user_id, current_price=1000 + i)
+            for i in range(items)
+        ]
+        db.add(order)
+        db.add_all(vehicles)
+        await db.flush()
+        db.add_all(
+            TovaryVZayavke(request_id=order.request_id, vehicle_id=vehicle.vehicle_id, quantity=1)
+            for vehicle in vehicles
+        )
+        await db.commit()
+        return order.request_id
+
+
+async def _count_detail_statements(database, item_counts):
+    user = await database.create()
+    counts = {}
+    try:
+        async with database.client(user) as client:
+            for items in item_counts:
+                request_id = await _create_order(database, user, items)
+                database.statements.clear()
+                response = await client.get(f"/requests/details/{request_id}")
+                assert response.status_code == 200
+                assert len(response.json()["items"]) == items
+                counts[items] = len(database.statements)
+    finally:
+        await database.engine.dispose()
+    return counts
+
+
+def test_order_details_statement_count_does_not_grow_with_items(database):
+    counts = asyncio.run(_count_detail_statements(database, (1, 10, 50)))
+
+    # Заказ и все его позиции с данными ТС читаются фиксированным числом запросов (без N+1)
+    assert len(set(counts.values())) == 1, counts
+    assert counts[1] <= 2, counts